@@ -7,26 +7,145 @@ import asyncio
 import argparse
 import sys
 import os
+import functools
+import logging
+import logging.handlers
+from collections import deque
+from itertools import islice
+from queue import SimpleQueue
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterator, List, Optional
 
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from mcp_memory_service.enhanced_server import EnhancedMemoryServer
-from mcp_memory_service.code_intelligence.chunker.factory import ChunkerFactory
-from mcp_memory_service.performance.cache import cache_manager
+# Heavy modules (server, storage, embedding models) are imported where they are
+# first needed so that --help and lightweight commands start quickly.
+
+logger = logging.getLogger("mcp_code_intelligence.cli")
+
+class _WriteHandler(logging.Handler):
+    """Logging handler that emits formatted records through a write callable."""
+    
+    def __init__(self, write):
+        super().__init__()
+        self._write = write
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        self._write(self.format(record))
+
+# Directories never worth descending into during ingestion
+_EXCLUDED_DIRS = frozenset({
+    'node_modules', '__pycache__', 'venv', 'env', 'dist', 'build', 'target',
+    '.git', '.venv', '.mypy_cache', '.pytest_cache', '.tox'
+})
+
+@functools.lru_cache(maxsize=1)
+def _supported_extensions() -> FrozenSet[str]:
+    """Return the chunker-supported file suffixes, normalized to lowercase '.ext' form."""
+    from mcp_memory_service.code_intelligence.chunker.factory import CHUNKER_FACTORY
+    return frozenset(
+        ext.lower() if ext.startswith('.') else f".{ext.lower()}"
+        for ext in CHUNKER_FACTORY.get_supported_extensions()
+    )
+
+# Commands that drive repository sync, batch analysis or auto-sync
+CMDS_NEEDING_CODE_INTELLIGENCE = frozenset({
+    'ingest-file', 'ingest-dir', 'sync-repository', 'list-repositories', 'list-repos',
+    'repository-status', 'batch-analyze', 'batch-report',
+    'auto-sync-config', 'auto-sync-status', 'auto-sync-scan', 'auto-sync-paths'
+})
+
+# Commands that only touch in-process state and never need the server
+CMDS_WITHOUT_SERVER = frozenset({'cache-stats', 'clear-cache'})
+
+def _ingest_file_worker(file_path: str, repository: str):
+    """Read and chunk a file in a worker process, returning (chunk_count, chunks)."""
+    from mcp_memory_service.code_intelligence.chunker.factory import CHUNKER_FACTORY
+    chunker = CHUNKER_FACTORY.get_chunker(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    chunks = chunker.chunk_content(content, file_path, repository)
+    return len(chunks), chunks
+
+@functools.lru_cache(maxsize=4096)
+def _default_repo_for(path: str, is_dir: bool) -> str:
+    """Default repository name: the directory's own name, or a file's parent directory name."""
+    return Path(path).name if is_dir else Path(path).parent.name
+
+def _is_path_within_root(path: Path, root: Path) -> bool:
+    """Return True if the resolved path lies inside the resolved root."""
+    return path == root or path.is_relative_to(root)
+
+def _iter_source_files(root: str, extensions: FrozenSet[str], excluded_dirs: FrozenSet[str],
+                       recursive: bool = True, follow_symlinks: bool = False) -> Iterator[str]:
+    """Yield supported source files under root using os.scandir, pruning excluded directories.
+    
+    Symlinks are skipped unless follow_symlinks is set; followed links must
+    resolve inside root, and each real directory is visited at most once.
+    """
+    root_real = Path(root).resolve()
+    visited_dirs = {root_real}
+    pending_dirs = deque([root])
+    while pending_dirs:
+        current = pending_dirs.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        if not follow_symlinks:
+                            continue
+                        target = Path(entry.path).resolve()
+                        if not _is_path_within_root(target, root_real):
+                            continue
+                        if entry.is_dir():
+                            if recursive and target not in visited_dirs and \
+                                    entry.name[0] != '.' and entry.name not in excluded_dirs:
+                                visited_dirs.add(target)
+                                pending_dirs.append(entry.path)
+                            continue
+                    elif entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name[0] != '.' and entry.name not in excluded_dirs:
+                            if follow_symlinks:
+                                # Track real directories so a link to them is not walked twice
+                                real_dir = Path(entry.path).resolve()
+                                if real_dir in visited_dirs:
+                                    continue
+                                visited_dirs.add(real_dir)
+                            pending_dirs.append(entry.path)
+                        continue
+                    
+                    if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions:
+                        yield entry.path
+        except OSError:
+            # Unreadable directory; skip it rather than aborting the whole walk
+            continue
 
 class CodeIntelligenceCLI:
     """CLI interface for code intelligence operations."""
     
-    def __init__(self):
+    def __init__(self, workers: int = 0):
         self.server = None
-    
-    async def initialize(self):
+        # Chunking is CPU-bound, so fan it out across processes when requested
+        self._pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    
+    def close(self) -> None:
+        """Shut down the worker process pool, if any, and drop batch results files."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self.server is not None:
+            self.server.remove_batch_result_files()
+    
+    async def initialize(self, enable_code_intelligence: bool = True):
         """Initialize the enhanced memory server."""
+        if self.server is not None:
+            return
         print("🚀 Initializing Code Intelligence system...")
-        self.server = EnhancedMemoryServer(enable_code_intelligence=True)
+        from mcp_memory_service.enhanced_server import EnhancedMemoryServer
+        self.server = EnhancedMemoryServer(enable_code_intelligence=enable_code_intelligence)
         print("✅ Ready")
     
     async def ingest_file(self, file_path: str, repository: str = None) -> None:
@@ -35,8 +154,14 @@ class CodeIntelligenceCLI:
             print(f"❌ Error: File not found: {file_path}")
             return
         
+        # Ingest the real file so stored paths never point through a symlink
+        file_path = str(Path(file_path).resolve())
+        if not os.path.isfile(file_path):
+            print(f"❌ Error: Not a regular file: {file_path}")
+            return
+        
         if not repository:
-            repository = Path(file_path).parent.name
+            repository = _default_repo_for(file_path, is_dir=False)
         
         print(f"📥 Ingesting {file_path} into repository '{repository}'...")
         
@@ -53,76 +178,175 @@ class CodeIntelligenceCLI:
             print(f"❌ Error ingesting file: {e}")
     
     async def ingest_directory(self, directory: str, repository: str = None, 
-                             recursive: bool = True) -> None:
+                             recursive: bool = True, concurrency: int = 4,
+                             batch_size: int = 64, follow_symlinks: bool = False) -> None:
         """Ingest all supported files in a directory."""
         if not os.path.exists(directory):
             print(f"❌ Error: Directory not found: {directory}")
             return
         
         if not repository:
-            repository = Path(directory).name
-        
-        # Get supported extensions
-        factory = ChunkerFactory()
-        supported_extensions = factory.get_supported_extensions()
-        
-        # Find all supported files
-        files_to_ingest = []
-        
-        if recursive:
-            for root, dirs, files in os.walk(directory):
-                # Skip common directories that shouldn't be indexed
-                dirs[:] = [d for d in dirs if not d.startswith('.') and 
-                          d not in ['node_modules', '__pycache__', 'venv', 'env', 'dist', 'build']]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if any(file.endswith(ext) for ext in supported_extensions):
-                        files_to_ingest.append(file_path)
-        else:
-            for file in os.listdir(directory):
-                file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path) and any(file.endswith(ext) for ext in supported_extensions):
-                    files_to_ingest.append(file_path)
-        
-        if not files_to_ingest:
-            print(f"❌ No supported files found in {directory}")
-            print(f"Supported extensions: {', '.join(supported_extensions)}")
-            return
-        
-        print(f"📂 Found {len(files_to_ingest)} files to ingest into '{repository}'")
-        
-        total_chunks = 0
-        successful_files = 0
+            repository = _default_repo_for(directory, is_dir=True)
+        
+        extensions = _supported_extensions()
+        
+        worker_count = max(1, concurrency)
+        batch_size = max(1, batch_size)
+        
+        # Chunks from several files are stored together to amortize embedding calls;
+        # each buffered file keeps its own chunks so store failures are charged to it
+        chunk_buffer: deque = deque()
+        buffered_chunks = 0
+        
+        def _record(ok: bool, chunk_count: int, rel_path: str, error) -> None:
+            """Count one finished file and advance the progress bar."""
+            nonlocal total_chunks, successful_files, failed_files
+            if error is not None:
+                failed_files += 1
+                logger.error(f"{rel_path}: {error}")
+            elif ok:
+                total_chunks += chunk_count
+                successful_files += 1
+            else:
+                logger.debug(f"{rel_path}: no chunks extracted")
+            progress.update(1)
+            progress.set_postfix(chunks=total_chunks, refresh=False)
+        
+        async def _flush_chunks() -> None:
+            """Store everything buffered so far in a single batch, then count its files."""
+            nonlocal buffered_chunks
+            if not chunk_buffer:
+                return
+            # Take ownership before awaiting so other workers start a fresh batch
+            files = list(chunk_buffer)
+            chunk_buffer.clear()
+            buffered_chunks = 0
+            batch = [chunk for _, chunks in files for chunk in chunks]
+            try:
+                results = await self.server._store_code_chunk_results(batch, repository)
+            except Exception as e:
+                results = [(False, str(e))] * len(batch)
+            
+            results = iter(results)
+            for rel_path, chunks in files:
+                errors = [
+                    message for success, message in islice(results, len(chunks))
+                    if not success and "Duplicate content detected" not in message
+                ]
+                if errors:
+                    _record(False, 0, rel_path,
+                            f"{len(errors)}/{len(chunks)} chunks failed to store: {errors[0]}")
+                else:
+                    _record(True, len(chunks), rel_path, None)
         
-        for i, file_path in enumerate(files_to_ingest):
+        async def _ingest_one(file_path: str, contents: Optional[asyncio.Future]):
+            """Ingest a single file, returning (ok, chunks, rel_path, error).
+            
+            Returns None when the file's chunks were buffered; it is counted once
+            the buffer is flushed and their store results are known.
+            """
+            nonlocal buffered_chunks
+            rel_path = os.path.relpath(file_path, directory)
             try:
-                rel_path = os.path.relpath(file_path, directory)
-                print(f"📥 [{i+1}/{len(files_to_ingest)}] {rel_path}...")
-                
-                arguments = {
-                    'file_path': file_path,
-                    'repository': repository
-                }
-                
-                result = await self.server._handle_ingest_code_file(arguments)
-                # Extract chunk count from result text
-                result_text = result[0].text if result else ""
-                if "Successfully ingested" in result_text:
-                    # Parse "Successfully ingested X/Y code chunks"
-                    chunks_line = result_text.split('\n')[0]
-                    chunk_count = int(chunks_line.split()[2].split('/')[0])
-                    total_chunks += chunk_count
-                    successful_files += 1
-                    print(f"   ✅ {chunk_count} chunks")
+                if self._pool is not None:
+                    # Chunk in a worker process, store from the main process
+                    loop = asyncio.get_running_loop()
+                    _, chunks = await loop.run_in_executor(
+                        self._pool, _ingest_file_worker, file_path, repository
+                    )
                 else:
-                    print(f"   ⚠️  No chunks extracted")
-                
+                    # Contents were read ahead while earlier files were being processed;
+                    # chunking runs in a thread so the event loop stays free
+                    chunks = await asyncio.to_thread(
+                        self.server._read_and_chunk, file_path, repository, await contents
+                    )
             except Exception as e:
-                print(f"   ❌ Error: {e}")
+                return False, 0, rel_path, e
+            
+            if not chunks:
+                return False, 0, rel_path, None
+            # Both paths store through the shared buffer, one store_many per batch
+            chunk_buffer.append((rel_path, chunks))
+            buffered_chunks += len(chunks)
+            if buffered_chunks >= batch_size:
+                await _flush_chunks()
+            return None
+        
+        # Bounded queue keeps in-flight work independent of the tree size; it also
+        # caps read-ahead at 2 * worker_count files
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * worker_count)
+        loop = asyncio.get_running_loop()
+        
+        async def _enqueue(file_path: str) -> None:
+            """Queue a file, starting its read now when chunking happens in-process."""
+            contents = None
+            if self._pool is None:
+                contents = asyncio.ensure_future(asyncio.to_thread(Path(file_path).read_bytes))
+            # The walk is streamed, so the bar's total grows as files are found
+            progress.total += 1
+            await queue.put((file_path, contents))
+        
+        def _discover() -> int:
+            """Walk the tree in a thread, handing paths to the event loop with backpressure."""
+            discovered = 0
+            for file_path in _iter_source_files(directory, extensions, _EXCLUDED_DIRS, recursive,
+                                                follow_symlinks):
+                asyncio.run_coroutine_threadsafe(_enqueue(file_path), loop).result()
+                discovered += 1
+            return discovered
+        
+        async def producer() -> int:
+            try:
+                return await asyncio.to_thread(_discover)
+            finally:
+                # One sentinel per worker signals shutdown
+                for _ in range(worker_count):
+                    await queue.put(None)
+        
+        total_chunks = 0
+        successful_files = 0
+        failed_files = 0
+        
+        async def worker() -> None:
+            while (item := await queue.get()) is not None:
+                outcome = await _ingest_one(*item)
+                # No await between read and update, so counters stay consistent across workers
+                if outcome is not None:
+                    _record(*outcome)
+        
+        print(f"📂 Ingesting supported files from {directory} into '{repository}'")
+        
+        from tqdm import tqdm
+        progress = tqdm(total=0, unit="file", desc="Ingesting")
+        
+        # Errors go through a queue so writing them never blocks the event loop,
+        # and are printed above the progress bar instead of through it
+        log_queue: SimpleQueue = SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        listener = logging.handlers.QueueListener(log_queue, _WriteHandler(tqdm.write))
+        logger.addHandler(queue_handler)
+        propagate, logger.propagate = logger.propagate, False
+        listener.start()
+        try:
+            total_files, *_ = await asyncio.gather(
+                producer(), *(worker() for _ in range(worker_count))
+            )
+            await _flush_chunks()
+        finally:
+            progress.close()
+            listener.stop()
+            logger.removeHandler(queue_handler)
+            logger.propagate = propagate
+        
+        if not total_files:
+            print(f"❌ No supported files found in {directory}")
+            print(f"Supported extensions: {', '.join(sorted(extensions))}")
+            return
         
         print(f"\n🎉 Ingestion complete:")
-        print(f"   📊 {successful_files}/{len(files_to_ingest)} files processed")
+        print(f"   📊 {successful_files}/{total_files} files processed")
+        if failed_files:
+            print(f"   ❌ {failed_files} files failed")
         print(f"   🧩 {total_chunks} total code chunks stored")
     
     async def search_code(self, query: str, repository: str = None, 
@@ -168,36 +392,13 @@ class CodeIntelligenceCLI:
         except Exception as e:
             print(f"❌ Error getting stats: {e}")
     
-    async def list_repositories(self) -> None:
-        """List all known repositories."""
-        print("📚 Available Repositories")
-        print()
-        
-        try:
-            # Get all memories and extract unique repositories
-            results = await self.server.storage.retrieve("repository", 1000)
-            repositories = set()
-            
-            for result in results:
-                metadata = result.memory.metadata or {}
-                repo = metadata.get("repository")
-                if repo:
-                    repositories.add(repo)
-            
-            if repositories:
-                for repo in sorted(repositories):
-                    print(f"   📂 {repo}")
-            else:
-                print("   No repositories found")
-        except Exception as e:
-            print(f"❌ Error listing repositories: {e}")
-    
     async def cache_stats(self) -> None:
         """Display cache performance statistics."""
         print("🚀 Cache Performance Statistics")
         print()
         
         try:
+            from mcp_memory_service.performance.cache import cache_manager
             stats = cache_manager.get_cache_stats()
             
             # Search cache stats
@@ -208,6 +409,9 @@ class CodeIntelligenceCLI:
             print(f"   Hits: {search_stats['hits']}")
             print(f"   Misses: {search_stats['misses']}")
             print(f"   Evictions: {search_stats['evictions']}")
+            print(f"   Admissions: {search_stats.get('admissions', 0)}")
+            print(f"   Rejections: {search_stats.get('rejections', 0)}")
+            print(f"   Avg Value Score: {search_stats.get('avg_value_score', 0.0):.4f}")
             print()
             
             # Stats cache stats  
@@ -218,12 +422,16 @@ class CodeIntelligenceCLI:
             print(f"   Hits: {stats_cache_stats['hits']}")
             print(f"   Misses: {stats_cache_stats['misses']}")
             print(f"   Evictions: {stats_cache_stats['evictions']}")
+            print(f"   Admissions: {stats_cache_stats.get('admissions', 0)}")
+            print(f"   Rejections: {stats_cache_stats.get('rejections', 0)}")
             
         except Exception as e:
             print(f"❌ Error getting cache stats: {e}")
     
     async def clear_cache(self, repository: str = None) -> None:
         """Clear cache entries."""
+        from mcp_memory_service.performance.cache import cache_manager
+        
         if repository:
             print(f"🧹 Clearing cache for repository '{repository}'...")
             invalidated = cache_manager.invalidate_repository(repository)
@@ -305,8 +513,8 @@ class CodeIntelligenceCLI:
             print(f"❌ Error synchronizing repository: {e}")
     
     async def list_repositories(self) -> None:
-        """List all synchronized repositories."""
-        print("📁 Listing synchronized repositories...")
+        """List all known repositories, with sync details where available."""
+        print("📁 Listing repositories...")
         print()
         
         try:
@@ -584,6 +792,10 @@ Examples:
     ingest_dir_parser.add_argument('--repository', '-r', help='Repository name (default: directory name)')
     ingest_dir_parser.add_argument('--recursive', action='store_true', default=True, help='Process subdirectories (default)')
     ingest_dir_parser.add_argument('--no-recursive', dest='recursive', action='store_false', help='Don\'t process subdirectories')
+    ingest_dir_parser.add_argument('--concurrency', '-c', type=int, default=4, help='Number of concurrent ingest workers (default: 4)')
+    ingest_dir_parser.add_argument('--batch-size', '-b', type=int, default=64, help='Chunks stored per embedding batch (default: 64)')
+    ingest_dir_parser.add_argument('--follow-symlinks', action='store_true', help='Follow symlinks that stay inside the directory (default: skip symlinks)')
+    ingest_dir_parser.add_argument('--workers', '-w', type=int, default=0, help='Worker processes for chunking (default: 0, chunk in-process)')
     
     # Search command
     search_parser = subparsers.add_parser(
@@ -729,6 +941,46 @@ Examples:
     
     return parser
 
+# Subcommand name -> coroutine taking (cli, args)
+COMMAND_HANDLERS: Dict[str, Callable[[CodeIntelligenceCLI, argparse.Namespace], Awaitable[None]]] = {
+    'ingest-file': lambda cli, args: cli.ingest_file(args.file_path, args.repository),
+    'ingest-dir': lambda cli, args: cli.ingest_directory(
+        args.directory, args.repository, args.recursive, args.concurrency,
+        args.batch_size, args.follow_symlinks
+    ),
+    'search': lambda cli, args: cli.search_code(args.query, args.repository, args.language, args.results),
+    'stats': lambda cli, args: cli.get_stats(args.repository),
+    'list-repos': lambda cli, args: cli.list_repositories(),
+    'cache-stats': lambda cli, args: cli.cache_stats(),
+    'clear-cache': lambda cli, args: cli.clear_cache(args.repository),
+    'analyze-security': lambda cli, args: cli.analyze_security(
+        args.repository, args.language, args.severity, args.limit
+    ),
+    'sync-repository': lambda cli, args: cli.sync_repository(
+        args.repository_path, args.repository_name, args.full, args.no_incremental
+    ),
+    'list-repositories': lambda cli, args: cli.list_repositories(),
+    'repository-status': lambda cli, args: cli.get_repository_status(args.repository_name),
+    'batch-analyze': lambda cli, args: cli.batch_analyze_repository(
+        args.repository_path, args.repository_name, not args.no_store, args.workers, not args.no_report
+    ),
+    'batch-report': lambda cli, args: cli.get_batch_analysis_report(args.repository_name, args.format, args.output),
+    'metrics': lambda cli, args: cli.get_performance_metrics(args.hours, args.type),
+    'system-health': lambda cli, args: cli.get_system_health(args.history),
+    'cleanup-metrics': lambda cli, args: cli.cleanup_metrics(),
+    'auto-sync-config': lambda cli, args: cli.configure_auto_sync(
+        scan_paths=args.scan_paths,
+        exclude_patterns=args.exclude_patterns,
+        scan_interval=args.scan_interval,
+        max_concurrent=args.max_concurrent,
+        priority_languages=args.priority_languages,
+        enabled=args.enabled
+    ),
+    'auto-sync-status': lambda cli, args: cli.get_auto_sync_status(),
+    'auto-sync-scan': lambda cli, args: cli.trigger_auto_sync_scan(),
+    'auto-sync-paths': lambda cli, args: cli.get_auto_sync_paths(),
+}
+
 async def main():
     """Main CLI entry point."""
     parser = create_parser()
@@ -738,79 +990,15 @@ async def main():
         parser.print_help()
         return
     
-    cli = CodeIntelligenceCLI()
+    cli = CodeIntelligenceCLI(workers=args.workers if args.command == 'ingest-dir' else 0)
     
     try:
-        await cli.initialize()
-        
-        if args.command == 'ingest-file':
-            await cli.ingest_file(args.file_path, args.repository)
-        
-        elif args.command == 'ingest-dir':
-            await cli.ingest_directory(args.directory, args.repository, args.recursive)
-        
-        elif args.command == 'search':
-            await cli.search_code(args.query, args.repository, args.language, args.results)
-        
-        elif args.command == 'stats':
-            await cli.get_stats(args.repository)
-        
-        elif args.command == 'list-repos':
-            await cli.list_repositories()
-        
-        elif args.command == 'cache-stats':
-            await cli.cache_stats()
-        
-        elif args.command == 'clear-cache':
-            await cli.clear_cache(args.repository)
-        
-        elif args.command == 'analyze-security':
-            await cli.analyze_security(args.repository, args.language, args.severity, args.limit)
-        
-        elif args.command == 'sync-repository':
-            await cli.sync_repository(args.repository_path, args.repository_name, args.full, args.no_incremental)
-        
-        elif args.command == 'list-repositories':
-            await cli.list_repositories()
-        
-        elif args.command == 'repository-status':
-            await cli.get_repository_status(args.repository_name)
-        
-        elif args.command == 'batch-analyze':
-            await cli.batch_analyze_repository(args.repository_path, args.repository_name, 
-                                             not args.no_store, args.workers, not args.no_report)
-        
-        elif args.command == 'batch-report':
-            await cli.get_batch_analysis_report(args.repository_name, args.format, args.output)
-        
-        elif args.command == 'metrics':
-            await cli.get_performance_metrics(args.hours, args.type)
-        
-        elif args.command == 'system-health':
-            await cli.get_system_health(args.history)
-        
-        elif args.command == 'cleanup-metrics':
-            await cli.cleanup_metrics()
-        
-        elif args.command == 'auto-sync-config':
-            await cli.configure_auto_sync(
-                scan_paths=args.scan_paths,
-                exclude_patterns=args.exclude_patterns,
-                scan_interval=args.scan_interval,
-                max_concurrent=args.max_concurrent,
-                priority_languages=args.priority_languages,
-                enabled=args.enabled
-            )
-        
-        elif args.command == 'auto-sync-status':
-            await cli.get_auto_sync_status()
-        
-        elif args.command == 'auto-sync-scan':
-            await cli.trigger_auto_sync_scan()
-        
-        elif args.command == 'auto-sync-paths':
-            await cli.get_auto_sync_paths()
+        if args.command not in CMDS_WITHOUT_SERVER:
+            await cli.initialize(args.command in CMDS_NEEDING_CODE_INTELLIGENCE)
         
+        handler = COMMAND_HANDLERS.get(args.command)
+        if handler:
+            await handler(cli, args)
         else:
             parser.print_help()
             
@@ -819,6 +1007,17 @@ async def main():
     except Exception as e:
         print(f"❌ Fatal error: {e}")
         sys.exit(1)
+    finally:
+        cli.close()
+
+def _install_fast_event_loop() -> None:
+    """Use uvloop when it is installed; the default loop is kept elsewhere (e.g. Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
 
 if __name__ == '__main__':
+    _install_fast_event_loop()
     asyncio.run(main())
\ No newline at end of file
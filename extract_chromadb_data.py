@@ -2,10 +2,74 @@
 """Extract data from ChromaDB using the API."""
 import sys
 import os
+import json
 sys.path.insert(0, 'src')
 
-import chromadb
 from collections import Counter
+from scripts._chroma_client import get_collection
+
+# orjson is much faster on large exports; fall back to the stdlib when it is missing
+try:
+    import orjson
+    
+    def dumps(obj):
+        return orjson.dumps(obj)
+    
+    def dumps_line(obj):
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    def dumps_line(obj):
+        return dumps(obj) + b'\n'
+
+# With pyarrow the export is a zstd-compressed Parquet file, which is much
+# smaller and faster to read back than JSON; otherwise it is NDJSON
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    EXPORT_PATH = 'chromadb_export.parquet'
+    EXPORT_SCHEMA = pa.schema([
+        ('id', pa.string()),
+        ('document', pa.string()),
+        ('metadata_json', pa.string()),
+    ])
+except ImportError:
+    pq = None
+    EXPORT_PATH = 'chromadb_export.ndjson'
+
+def iter_pages(collection, page_size):
+    """Yield the collection page by page so only one page is held in memory."""
+    offset = 0
+    while True:
+        result = collection.get(
+            limit=page_size,
+            offset=offset,
+            include=['documents', 'metadatas']
+        )
+        if not result or not result.get('ids'):
+            return
+        yield result
+        offset += len(result['ids'])
+
+def write_parquet(pages, path):
+    """Write each page as one Parquet row group."""
+    with pq.ParquetWriter(path, EXPORT_SCHEMA, compression='zstd') as writer:
+        for page in pages:
+            writer.write_table(pa.table({
+                'id': page['ids'],
+                'document': page['documents'],
+                'metadata_json': [dumps(metadata or {}).decode('utf-8') for metadata in page['metadatas']],
+            }, schema=EXPORT_SCHEMA))
+
+def write_ndjson(pages, path):
+    """Write one {"id", "document", "metadata"} object per line."""
+    with open(path, 'wb') as f:
+        for page in pages:
+            for doc_id, document, metadata in zip(page['ids'], page['documents'], page['metadatas']):
+                f.write(dumps_line({'id': doc_id, 'document': document, 'metadata': metadata}))
 
 # Use the corrupted database
 SOURCE_DB = "/home/felipe/.local/share/mcp-memory/chroma_db_corrupted_20250524_224100"
@@ -16,67 +80,53 @@ print("=" * 50)
 # We need to use a workaround to avoid the segfault
 # First, let's try to connect directly
 try:
-    client = chromadb.PersistentClient(path=SOURCE_DB)
-    print("Connected to ChromaDB")
-    
     # Get the collection
-    collection = client.get_collection("memory_collection")
+    collection = get_collection(SOURCE_DB)
+    print("Connected to ChromaDB")
     print(f"Found collection: memory_collection")
     
     # Get count
     count = collection.count()
     print(f"Collection has {count} documents")
     
-    # Try to get a small batch of documents
-    print("\nTrying to extract documents in small batches...")
+    # Page through the collection and stream each page to the export file
+    print("\nExtracting documents in pages...")
     
-    batch_size = 10
-    offset = 0
-    all_documents = []
-    all_ids = []
-    all_metadatas = []
+    page_size = 5000
+    id_counts = Counter()
+    
+    def counted(pages):
+        """Tally ids for the duplicate check and report progress as pages stream past."""
+        extracted = 0
+        for page in pages:
+            id_counts.update(page['ids'])
+            yield page
+            extracted += len(page['ids'])
+            print(f"  Extracted {extracted}/{count} documents...")
     
-    # Get all data at once (might work better than batching)
     try:
-        print("Attempting to get all documents at once...")
-        result = collection.get()
+        write_export = write_parquet if pq is not None else write_ndjson
+        write_export(counted(iter_pages(collection, page_size)), EXPORT_PATH)
         
-        if result and result.get('ids'):
-            all_ids = result['ids']
-            all_documents = result['documents']
-            all_metadatas = result['metadatas']
-            
-            print(f"Successfully extracted {len(all_ids)} documents")
-            
-            # Check for duplicates
-            id_counts = Counter(all_ids)
-            duplicates = {id: count for id, count in id_counts.items() if count > 1}
-            
-            if duplicates:
-                print(f"\nFound {len(duplicates)} duplicate IDs:")
-                for id, count in list(duplicates.items())[:10]:
-                    print(f"  {id}: {count} copies")
-            else:
-                print("\nNo duplicates found in the extracted data")
-                
-            # Save the data for migration
-            import json
-            
-            export_data = {
-                'ids': all_ids,
-                'documents': all_documents,
-                'metadatas': all_metadatas
-            }
-            
-            with open('chromadb_export.json', 'w') as f:
-                json.dump(export_data, f, indent=2)
-                
-            print(f"\nData exported to chromadb_export.json")
-            print(f"Total documents: {len(all_ids)}")
-            print(f"Unique documents: {len(set(all_ids))}")
+        total = sum(id_counts.values())
+        print(f"Successfully extracted {total} documents")
+        
+        # Check for duplicates
+        duplicates = {id: count for id, count in id_counts.items() if count > 1}
+        
+        if duplicates:
+            print(f"\nFound {len(duplicates)} duplicate IDs:")
+            for id, count in list(duplicates.items())[:10]:
+                print(f"  {id}: {count} copies")
+        else:
+            print("\nNo duplicates found in the extracted data")
+        
+        print(f"\nData exported to {EXPORT_PATH}")
+        print(f"Total documents: {total}")
+        print(f"Unique documents: {len(id_counts)}")
             
     except Exception as e:
-        print(f"Error extracting all documents: {str(e)}")
+        print(f"Error extracting documents: {str(e)}")
         print("This might be due to the database corruption")
     
 except Exception as e:
@@ -2,77 +2,86 @@
 """Import clean data into new ChromaDB."""
 import sys
 import os
-import json
+import time
 sys.path.insert(0, 'src')
 
 from mcp_memory_service.storage.chroma import ChromaMemoryStorage
 from mcp_memory_service.models.memory import Memory
 from mcp_memory_service.config import CHROMA_PATH
+from scripts._chroma_export import find_export_path, iter_export_batches, embed_documents
 
 print("ChromaDB Clean Import Tool")
 print("=" * 50)
 
-# Load the exported data
-if not os.path.exists('chromadb_export.json'):
-    print("Error: chromadb_export.json not found. Run extract_chromadb_data.py first.")
+# The export is streamed batch by batch instead of loaded up front
+export_path = find_export_path()
+if export_path is None:
+    print("Error: no chromadb_export file found. Run extract_chromadb_data.py first.")
     sys.exit(1)
 
-print("Loading exported data...")
-with open('chromadb_export.json', 'r') as f:
-    data = json.load(f)
-
-print(f"Loaded {len(data['ids'])} documents")
-
 # Initialize clean storage
 print(f"\nInitializing clean database at: {CHROMA_PATH}")
 storage = ChromaMemoryStorage(CHROMA_PATH)
 
-# Import in batches
-batch_size = 100
+# Import in batches; one add() per batch lets the embedding model work on many documents at once
+batch_size = 500
 imported_count = 0
 skipped_count = 0
 error_count = 0
 
+processed_count = 0
+progress_interval = 2.0  # seconds between progress lines
+last_log = time.monotonic()
+
 print("\nImporting documents...")
-for i in range(0, len(data['ids']), batch_size):
-    batch_ids = data['ids'][i:i+batch_size]
-    batch_documents = data['documents'][i:i+batch_size]
-    batch_metadatas = data['metadatas'][i:i+batch_size]
+for batch_ids, batch_documents, batch_metadatas, _ in iter_export_batches(export_path, batch_size):
+    processed_count += len(batch_ids)
+    
+    # Drop test and empty documents in one pass over the batch
+    keep = [
+        (doc_id, document, metadata or {})
+        for doc_id, document, metadata in zip(batch_ids, batch_documents, batch_metadatas)
+        if document and document.strip() and not (metadata or {}).get('test', False)
+    ]
+    skipped_count += len(batch_ids) - len(keep)
+    to_add_ids = [doc_id for doc_id, _, _ in keep]
+    to_add_docs = [document for _, document, _ in keep]
+    to_add_metas = [metadata for _, _, metadata in keep]
+    
+    if not to_add_ids:
+        continue
     
-    # Process each document in the batch
-    for j in range(len(batch_ids)):
-        try:
-            doc_id = batch_ids[j]
-            document = batch_documents[j]
-            metadata = batch_metadatas[j] or {}
-            
-            # Skip test documents
-            if metadata.get('test', False):
-                skipped_count += 1
-                continue
-            
-            # Skip empty documents
-            if not document or document.strip() == "":
-                skipped_count += 1
-                continue
-            
-            # Store directly using ChromaDB API to preserve IDs
-            storage.collection.add(
-                documents=[document],
-                metadatas=[metadata],
-                ids=[doc_id]
-            )
-            
-            imported_count += 1
-            
-        except Exception as e:
-            error_count += 1
-            if error_count <= 5:
-                print(f"  Error importing document {i+j}: {str(e)}")
+    try:
+        # Store directly using ChromaDB API to preserve IDs
+        storage.collection.add(
+            documents=to_add_docs,
+            metadatas=to_add_metas,
+            ids=to_add_ids,
+            embeddings=embed_documents(storage.model, to_add_docs)
+        )
+        imported_count += len(to_add_ids)
+    except Exception:
+        # Retry this batch one document at a time so a bad row only loses itself
+        for doc_id, document, metadata in zip(to_add_ids, to_add_docs, to_add_metas):
+            try:
+                storage.collection.add(
+                    documents=[document],
+                    metadatas=[metadata],
+                    ids=[doc_id],
+                    embeddings=embed_documents(storage.model, [document])
+                )
+                imported_count += 1
+            except Exception as e:
+                error_count += 1
+                if error_count <= 5:
+                    print(f"  Error importing document {doc_id}: {str(e)}")
     
-    # Progress update
-    if (i + batch_size) % 1000 == 0:
-        print(f"  Processed {i + batch_size}/{len(data['ids'])} documents...")
+    # Progress update, throttled by wall clock rather than document count
+    now = time.monotonic()
+    if now - last_log > progress_interval:
+        sys.stdout.write(f"  Processed {processed_count} documents...\n")
+        sys.stdout.flush()
+        last_log = now
 
 print(f"\nImport complete!")
 print(f"  Successfully imported: {imported_count} documents")
@@ -85,8 +94,8 @@ print(f"\nVerification:")
 print(f"  Documents in database: {final_count}")
 
 # Clean up export file
-if os.path.exists('chromadb_export.json'):
-    os.remove('chromadb_export.json')
+if os.path.exists(export_path):
+    os.remove(export_path)
     print("\nCleaned up temporary export file")
 
 print("\nDatabase restoration completed!")
\ No newline at end of file
@@ -8,21 +8,47 @@ sys.path.insert(0, 'src')
 
 from mcp_memory_service.storage.chroma import ChromaMemoryStorage
 from mcp_memory_service.config import CHROMA_PATH
+from scripts._chroma_export import find_export_path, iter_export_batches, embed_documents
 
 print("ChromaDB Clean Import Tool (with Resume)")
 print("=" * 50)
 
-# Load the exported data
-if not os.path.exists('chromadb_export.json'):
-    print("Error: chromadb_export.json not found. Run extract_chromadb_data.py first.")
+CURSOR_PATH = '.resume_cursor.json'
+
+def export_signature(path):
+    """Identify the export file so a cursor from a different export is ignored."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def load_cursor(export_path):
+    """Return the saved cursor for the given export, or None."""
+    try:
+        with open(CURSOR_PATH, 'r') as f:
+            cursor = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cursor.get('export') != export_signature(export_path):
+        return None
+    return cursor
+
+def save_cursor(export_path, offset, lines, skipped):
+    """Atomically record how far into the export this and earlier runs have got."""
+    tmp_path = CURSOR_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'export': export_signature(export_path),
+            'offset': offset,
+            'lines': lines,
+            'skipped': skipped
+        }, f)
+    os.replace(tmp_path, CURSOR_PATH)
+
+# The export is streamed batch by batch instead of loaded up front
+export_path = find_export_path()
+if export_path is None:
+    print("Error: no chromadb_export file found. Run extract_chromadb_data.py first.")
     sys.exit(1)
 
-print("Loading exported data...")
-with open('chromadb_export.json', 'r') as f:
-    data = json.load(f)
-
-print(f"Loaded {len(data['ids'])} documents")
-
 # Initialize storage
 print(f"\nConnecting to database at: {CHROMA_PATH}")
 storage = ChromaMemoryStorage(CHROMA_PATH)
@@ -31,115 +57,122 @@ storage = ChromaMemoryStorage(CHROMA_PATH)
 current_count = storage.collection.count()
 print(f"Current database has {current_count} documents")
 
-# Get existing IDs to avoid duplicates
-print("Checking existing documents...")
-existing_ids = set()
-if current_count > 0:
-    # Get all existing IDs
-    result = storage.collection.get()
-    existing_ids = set(result['ids'])
-    print(f"Found {len(existing_ids)} existing documents")
-
-# Import remaining documents
-batch_size = 50  # Smaller batch size for reliability
+# A cursor from an earlier run lets us seek straight past imported documents.
+# Writes are upserts, so replaying a batch that was partly stored is harmless
+# and no scan of existing ids is needed.
+cursor = load_cursor(export_path)
+if cursor:
+    print(f"Resuming from saved cursor after {cursor['lines']} documents")
+
+# Import remaining documents; one upsert() per batch lets the embedding model work on many documents at once
+batch_size = 500
 imported_count = 0
-skipped_count = 0
-already_exists_count = len(existing_ids)
+skipped_count = cursor['skipped'] if cursor else 0
 error_count = 0
-start_time = time.time()
-
-print(f"\nStarting import from document {len(existing_ids)}...")
+# Once a batch loses documents the cursor stays before it, so the next run retries them
+cursor_held = False
+total_count = cursor['lines'] if cursor else 0
+start_offset = cursor['offset'] if cursor else 0
+progress_interval = 2.0  # seconds between progress lines
+start_time = time.monotonic()
+last_log = start_time
+
+print(f"\nStarting import from document {total_count}...")
 print("Press Ctrl+C to stop (can be resumed later)")
 
 try:
-    for i in range(0, len(data['ids']), batch_size):
-        batch_ids = data['ids'][i:i+batch_size]
-        batch_documents = data['documents'][i:i+batch_size]
-        batch_metadatas = data['metadatas'][i:i+batch_size]
+    for batch_ids, batch_documents, batch_metadatas, end_offset in iter_export_batches(
+            export_path, batch_size, start_offset):
+        total_count += len(batch_ids)
         
-        # Filter out already imported documents
-        new_indices = []
-        for j, doc_id in enumerate(batch_ids):
-            if doc_id not in existing_ids:
-                new_indices.append(j)
+        # Filter out test and empty documents
+        to_add_ids = []
+        to_add_docs = []
+        to_add_metas = []
+        for doc_id, document, metadata in zip(batch_ids, batch_documents, batch_metadatas):
+            metadata = metadata or {}
+            
+            # Skip test documents
+            if metadata.get('test', False):
+                skipped_count += 1
+                continue
+            
+            # Skip empty documents
+            if not document or document.strip() == "":
+                skipped_count += 1
+                continue
+            
+            to_add_ids.append(doc_id)
+            to_add_docs.append(document)
+            to_add_metas.append(metadata)
         
-        if not new_indices:
-            already_exists_count += len(batch_ids)
-            continue
-        
-        # Prepare filtered batches
-        filtered_ids = [batch_ids[j] for j in new_indices]
-        filtered_documents = [batch_documents[j] for j in new_indices]
-        filtered_metadatas = [batch_metadatas[j] for j in new_indices]
-        
-        # Process each document
-        for j in range(len(filtered_ids)):
+        if to_add_ids:
             try:
-                doc_id = filtered_ids[j]
-                document = filtered_documents[j]
-                metadata = filtered_metadatas[j] or {}
-                
-                # Skip test documents
-                if metadata.get('test', False):
-                    skipped_count += 1
-                    continue
-                
-                # Skip empty documents
-                if not document or document.strip() == "":
-                    skipped_count += 1
-                    continue
-                
-                # Store directly using ChromaDB API
-                storage.collection.add(
-                    documents=[document],
-                    metadatas=[metadata],
-                    ids=[doc_id]
+                # Store directly using ChromaDB API; upsert makes replays idempotent
+                storage.collection.upsert(
+                    documents=to_add_docs,
+                    metadatas=to_add_metas,
+                    ids=to_add_ids,
+                    embeddings=embed_documents(storage.model, to_add_docs)
                 )
-                
-                imported_count += 1
-                existing_ids.add(doc_id)
-                
-            except Exception as e:
-                error_count += 1
-                if error_count <= 5:
-                    print(f"\n  Error importing document: {str(e)}")
+                imported_count += len(to_add_ids)
+            except Exception:
+                # Retry this batch one document at a time so a bad row only loses itself
+                for doc_id, document, metadata in zip(to_add_ids, to_add_docs, to_add_metas):
+                    try:
+                        storage.collection.upsert(
+                            documents=[document],
+                            metadatas=[metadata],
+                            ids=[doc_id],
+                            embeddings=embed_documents(storage.model, [document])
+                        )
+                        imported_count += 1
+                    except Exception as e:
+                        error_count += 1
+                        cursor_held = True
+                        if error_count <= 5:
+                            print(f"\n  Error importing document: {str(e)}")
+        
+        if not cursor_held:
+            save_cursor(export_path, end_offset, total_count, skipped_count)
         
-        # Progress update
-        total_processed = already_exists_count + imported_count + skipped_count + error_count
-        if total_processed % 1000 == 0:
-            elapsed = time.time() - start_time
-            rate = imported_count / elapsed if elapsed > 0 else 0
-            remaining = len(data['ids']) - total_processed
-            eta = remaining / rate if rate > 0 else 0
-            print(f"\n  Progress: {total_processed}/{len(data['ids'])} documents")
-            print(f"  Imported: {imported_count}, Rate: {rate:.1f} docs/sec")
-            print(f"  ETA: {eta/60:.1f} minutes")
+        # Progress update, throttled by wall clock rather than document count
+        now = time.monotonic()
+        if now - last_log > progress_interval:
+            rate = imported_count / (now - start_time)
+            sys.stdout.write(
+                f"\n  Progress: {total_count} documents read\n"
+                f"  Imported: {imported_count}, Rate: {rate:.1f} docs/sec\n"
+            )
+            sys.stdout.flush()
+            last_log = now
 
 except KeyboardInterrupt:
     print("\n\nImport interrupted by user")
     print("The import can be resumed by running this script again")
 
 print(f"\n\nImport summary:")
-print(f"  Total documents in export: {len(data['ids'])}")
-print(f"  Already existed: {already_exists_count}")
+print(f"  Documents read from export: {total_count}")
 print(f"  Newly imported: {imported_count}")
 print(f"  Skipped: {skipped_count}")
 print(f"  Errors: {error_count}")
-print(f"  Time taken: {(time.time() - start_time)/60:.1f} minutes")
+print(f"  Time taken: {(time.monotonic() - start_time)/60:.1f} minutes")
 
 # Verify
 final_count = storage.collection.count()
 print(f"\nFinal verification:")
 print(f"  Documents in database: {final_count}")
 
-if final_count < len(data['ids']) - skipped_count:
+if final_count < total_count - skipped_count:
     print(f"\n⚠️  Not all documents were imported. Run this script again to continue.")
 else:
     print(f"\n✅ All documents imported successfully!")
+    if os.path.exists(CURSOR_PATH):
+        os.remove(CURSOR_PATH)
     # Clean up export file
     response = input("\nDelete export file? (y/n): ")
     if response.lower() == 'y':
-        os.remove('chromadb_export.json')
+        os.remove(export_path)
         print("Export file deleted.")
 
 print("\nDone!")
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Shared ChromaDB client for the maintenance scripts.
+
+Opening a PersistentClient loads the HNSW index and opens SQLite, so each
+path gets one client per process and every caller reuses it.
+"""
+from functools import lru_cache
+
+import chromadb
+
+@lru_cache(maxsize=None)
+def get_client(path: str) -> "chromadb.ClientAPI":
+    """Return the process-wide client for path, creating it on first use."""
+    return chromadb.PersistentClient(path=path)
+
+def get_collection(path: str, name: str = "memory_collection"):
+    """Return an existing collection from the shared client for path."""
+    return get_client(path).get_collection(name)
@@ -0,0 +1,139 @@
+"""
+Shared reading of ChromaDB exports for the import scripts.
+
+extract_chromadb_data.py writes a Parquet or NDJSON export; older versions
+wrote one JSON object of parallel arrays. Both importers read any of the
+three through iter_export_batches.
+"""
+import json
+import os
+from contextlib import ExitStack
+from itertools import islice
+
+# orjson is much faster on large exports; fall back to the stdlib when it is missing
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+EXPORT_PATH = 'chromadb_export.ndjson'
+PARQUET_EXPORT_PATH = 'chromadb_export.parquet'
+LEGACY_EXPORT_PATH = 'chromadb_export.json'
+
+def find_export_path():
+    """Return the export to import, preferring Parquet, then NDJSON, then legacy JSON; None if there is none."""
+    for path in (PARQUET_EXPORT_PATH, EXPORT_PATH, LEGACY_EXPORT_PATH):
+        if os.path.exists(path):
+            return path
+    return None
+
+def iter_parquet_batches(path, batch_size, start_row=0):
+    """Yield (ids, documents, metadatas, end_row) batches from a Parquet export; needs pyarrow."""
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+
+    # Skip whole row groups that end before start_row, then trim the remainder
+    first_group, row = 0, 0
+    while first_group < parquet_file.num_row_groups:
+        group_rows = parquet_file.metadata.row_group(first_group).num_rows
+        if row + group_rows > start_row:
+            break
+        row += group_rows
+        first_group += 1
+    skip = start_row - row
+    row = start_row
+
+    row_groups = range(first_group, parquet_file.num_row_groups)
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups):
+        if skip:
+            if skip >= record_batch.num_rows:
+                skip -= record_batch.num_rows
+                continue
+            record_batch = record_batch.slice(skip)
+            skip = 0
+        row += record_batch.num_rows
+        yield (
+            record_batch.column('id').to_pylist(),
+            record_batch.column('document').to_pylist(),
+            [loads(metadata) for metadata in record_batch.column('metadata_json').to_pylist()],
+            row,
+        )
+
+def iter_legacy_rows(path, start_row=0):
+    """Yield (id, document, metadata) rows from a pre-NDJSON export of parallel arrays.
+
+    The three arrays are streamed side by side with ijson when it is installed;
+    otherwise the whole file has to be loaded.
+    """
+    try:
+        import ijson
+    except ImportError:
+        with open(path, 'rb') as f:
+            data = loads(f.read())
+        yield from islice(zip(data['ids'], data['documents'], data['metadatas']), start_row, None)
+        return
+
+    with ExitStack() as stack:
+        columns = [
+            ijson.items(stack.enter_context(open(path, 'rb')), f'{key}.item', use_float=True)
+            for key in ('ids', 'documents', 'metadatas')
+        ]
+        yield from islice(zip(*columns), start_row, None)
+
+def iter_export_batches(path, batch_size, start_offset=0):
+    """Yield (ids, documents, metadatas, end_offset) batches from a Parquet, NDJSON or legacy JSON export.
+
+    end_offset is the byte position just past the batch, so a later run can seek straight to it.
+    For Parquet and legacy exports it is the row index instead.
+    """
+    if path == PARQUET_EXPORT_PATH:
+        yield from iter_parquet_batches(path, batch_size, start_offset)
+        return
+    if path == LEGACY_EXPORT_PATH:
+        rows = iter_legacy_rows(path, start_offset)
+        offset = start_offset
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            offset += len(batch)
+            ids, documents, metadatas = (list(column) for column in zip(*batch))
+            yield ids, documents, metadatas, offset
+
+    ids, documents, metadatas = [], [], []
+    offset = start_offset
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            row = loads(line)
+            ids.append(row['id'])
+            documents.append(row['document'])
+            metadatas.append(row['metadata'])
+            if len(ids) >= batch_size:
+                yield ids, documents, metadatas, offset
+                ids, documents, metadatas = [], [], []
+    if ids:
+        yield ids, documents, metadatas, offset
+
+def embed_documents(model, documents):
+    """Encode a batch with an already loaded sentence-transformers model so Chroma skips its own embedder.
+
+    Returns None when no model is loaded, leaving embedding to the collection.
+    """
+    if model is None:
+        return None
+    # torch is only needed for inference_mode
+    import torch
+    with torch.inference_mode():
+        embeddings = model.encode(
+            documents,
+            batch_size=128,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+    return embeddings.astype('float32').tolist()
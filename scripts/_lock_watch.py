@@ -0,0 +1,105 @@
+"""
+Event-driven watching of the ChromaDB lock file for the debug scripts.
+
+On Linux with inotify_simple installed, the lock file's directory is watched
+with inotify and the callback runs only when the lock file is created,
+deleted or written. Everywhere else the file is polled once per interval,
+as the scripts did before.
+
+is_lock_held() probes the lock with filelock when it is available, and
+with a bare fcntl.flock otherwise.
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # not installed, or not on Linux
+    INotify = None
+
+try:
+    from filelock import FileLock, Timeout
+except ImportError:
+    FileLock = None
+
+def is_lock_held(lock_path: Path) -> bool:
+    """Return whether another process holds lock_path, without waiting for it."""
+    if FileLock is not None:
+        probe = FileLock(str(lock_path))
+        try:
+            probe.acquire(timeout=0)
+        except Timeout:
+            return True
+        probe.release()
+        return False
+
+    import fcntl
+    with open(lock_path, 'r') as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            return False
+        except IOError:
+            return True
+
+async def watch_lock_file(lock_path: Path, on_change: Callable[[], None],
+                          duration: Optional[float] = None, poll_interval: float = 1.0) -> None:
+    """Call on_change once now and again whenever lock_path changes, until duration elapses or cancelled."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration if duration is not None else None
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - loop.time())
+
+    on_change()
+
+    inotify = None
+    if INotify is not None and lock_path.parent.is_dir():
+        try:
+            inotify = INotify(nonblocking=True)
+            inotify.add_watch(
+                str(lock_path.parent),
+                inotify_flags.CREATE | inotify_flags.DELETE | inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE
+            )
+        except OSError as e:
+            logger.debug(f"inotify unavailable, falling back to polling: {e}")
+            inotify = None
+
+    if inotify is None:
+        while deadline is None or loop.time() < deadline:
+            await asyncio.sleep(poll_interval if deadline is None else min(poll_interval, remaining()))
+            on_change()
+        return
+
+    changed = asyncio.Event()
+    expired = False
+
+    def drain() -> None:
+        if any(event.name == lock_path.name for event in inotify.read()):
+            changed.set()
+
+    def expire() -> None:
+        nonlocal expired
+        expired = True
+        changed.set()
+
+    # One timer for the whole watch wakes the loop at the deadline, instead
+    # of a wait_for wrapper task around every single wait
+    timer = loop.call_at(deadline, expire) if deadline is not None else None
+    loop.add_reader(inotify.fileno(), drain)
+    try:
+        while True:
+            await changed.wait()
+            changed.clear()
+            if expired:
+                break
+            on_change()
+    finally:
+        if timer is not None:
+            timer.cancel()
+        loop.remove_reader(inotify.fileno())
+        inotify.close()
@@ -4,14 +4,16 @@ Script to analyze duplicate embeddings in ChromaDB without modifying anything.
 """
 import os
 import sys
-import chromadb
-from collections import defaultdict
+from hashlib import blake2b
 import logging
 
+import numpy as np
+
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from mcp_memory_service.config import CHROMA_PATH
+from _chroma_client import get_collection
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,12 +23,9 @@ def analyze_duplicates():
     chroma_path = CHROMA_PATH
     logger.info(f"Connecting to ChromaDB at: {chroma_path}")
     
-    # Initialize ChromaDB client
-    client = chromadb.PersistentClient(path=chroma_path)
-    
     try:
-        # Get the collection
-        collection = client.get_collection("memory_collection")
+        # Get the collection from the shared client
+        collection = get_collection(chroma_path)
         logger.info(f"Connected to collection: memory_collection")
         
         # Get all documents
@@ -40,37 +39,50 @@ def analyze_duplicates():
         total_docs = len(results['ids'])
         logger.info(f"Found {total_docs} total documents")
         
-        # Group documents by content to find duplicates
-        content_to_ids = defaultdict(list)
-        id_to_metadata = {}
+        # Sort fixed-size content digests and scan runs of equal digests to
+        # find duplicate groups, instead of hashing every document into a dict
+        ids = results['ids']
+        documents = results['documents']
+        metadatas = results['metadatas']
+        digests = b''.join(
+            # Rows added with embeddings only have no document; they group as empty content
+            blake2b((content or '').encode('utf-8'), digest_size=16).digest() for content in documents
+        )
+        hashes = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 2)
+        order = np.lexsort((hashes[:, 1], hashes[:, 0]))
+        sorted_hashes = hashes[order]
         
-        for i, (doc_id, content, metadata) in enumerate(zip(results['ids'], results['documents'], results['metadatas'])):
-            content_to_ids[content].append(doc_id)
-            id_to_metadata[doc_id] = metadata
+        # A new group starts wherever a digest differs from the one before it
+        boundaries = np.flatnonzero(np.any(sorted_hashes[1:] != sorted_hashes[:-1], axis=1)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(order)]))
         
         # Analyze duplicates
         duplicate_groups = 0
         total_duplicates = 0
         
         print("\n=== Duplicate Analysis ===")
-        for content, id_list in content_to_ids.items():
-            if len(id_list) > 1:
+        for start, end in zip(starts, ends):
+            group_size = int(end - start)
+            if group_size > 1:
+                group = order[start:end]
+                content = documents[group[0]] or ''
                 duplicate_groups += 1
-                total_duplicates += len(id_list) - 1  # All but one are duplicates
+                total_duplicates += group_size - 1  # All but one are duplicates
                 
                 print(f"\nDuplicate Group {duplicate_groups}:")
                 print(f"Content: {content[:100]}{'...' if len(content) > 100 else ''}")
-                print(f"Number of duplicates: {len(id_list)}")
+                print(f"Number of duplicates: {group_size}")
                 
                 # Show metadata for each duplicate
-                for doc_id in id_list[:5]:  # Show max 5 examples
-                    metadata = id_to_metadata[doc_id]
-                    print(f"  - ID: {doc_id}")
+                for idx in group[:5]:  # Show max 5 examples
+                    metadata = metadatas[idx]
+                    print(f"  - ID: {ids[idx]}")
                     print(f"    Tags: {metadata.get('tags', 'N/A')}")
                     print(f"    Timestamp: {metadata.get('timestamp', 'N/A')}")
                 
-                if len(id_list) > 5:
-                    print(f"  ... and {len(id_list) - 5} more")
+                if group_size > 5:
+                    print(f"  ... and {group_size - 5} more")
         
         print(f"\n=== Summary ===")
         print(f"Total documents: {total_docs}")
@@ -92,7 +92,7 @@ async def backup_memories():
         
         # Write backup to file
         with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=2, ensure_ascii=False)
+            json.dump(backup_data, f, separators=(',', ':'), ensure_ascii=False)
         
         logger.info(f"Successfully backed up {total_memories} memories to {backup_file}")
         return backup_file
@@ -5,15 +5,17 @@ This issue can occur when multiple auto-sync instances run simultaneously.
 """
 import os
 import sys
-import chromadb
 from datetime import datetime
 import logging
-from collections import defaultdict
+from array import array
+from collections import Counter
+from hashlib import blake2b
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from mcp_memory_service.config import CHROMA_PATH
+from _chroma_client import get_collection
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -23,12 +25,9 @@ def cleanup_duplicates():
     chroma_path = CHROMA_PATH
     logger.info(f"Connecting to ChromaDB at: {chroma_path}")
     
-    # Initialize ChromaDB client
-    client = chromadb.PersistentClient(path=chroma_path)
-    
     try:
-        # Get the collection
-        collection = client.get_collection("memory_collection")
+        # Get the collection from the shared client
+        collection = get_collection(chroma_path)
         logger.info(f"Connected to collection: memory_collection")
         
         # Get all documents
@@ -41,32 +40,38 @@ def cleanup_duplicates():
         
         logger.info(f"Found {len(results['ids'])} total documents")
         
-        # Group documents by content to find duplicates
-        content_to_ids = defaultdict(list)
-        for i, (doc_id, content) in enumerate(zip(results['ids'], results['documents'])):
-            content_to_ids[content].append((doc_id, i))
-        
-        # Find and remove duplicates
-        duplicates_removed = 0
-        for content, id_list in content_to_ids.items():
-            if len(id_list) > 1:
-                logger.info(f"Found {len(id_list)} duplicates for content: {content[:100]}...")
-                
-                # Sort by metadata timestamp if available, keep the oldest
-                sorted_ids = []
-                for doc_id, idx in id_list:
-                    metadata = results['metadatas'][idx]
-                    timestamp = metadata.get('timestamp', '1970-01-01T00:00:00')
-                    sorted_ids.append((timestamp, doc_id))
-                
-                sorted_ids.sort()  # Keep the oldest
-                
-                # Remove all but the first (oldest)
-                ids_to_remove = [doc_id for _, doc_id in sorted_ids[1:]]
-                
-                logger.info(f"Removing {len(ids_to_remove)} duplicate IDs")
-                collection.delete(ids=ids_to_remove)
-                duplicates_removed += len(ids_to_remove)
+        # Pass 1: digest every document and count each digest
+        ids = results['ids']
+        documents = results['documents']
+        metadatas = results['metadatas']
+        digests = [blake2b(content.encode('utf-8'), digest_size=16).digest() for content in documents]
+        digest_counts = Counter(digests)
+        
+        # Pass 2: collect row indexes only for digests seen more than once;
+        # unique documents, the common case, never get a group allocated
+        groups = {}
+        for idx, h in enumerate(digests):
+            if digest_counts[h] > 1:
+                groups.setdefault(h, array('I')).append(idx)
+        
+        # Find duplicates, keeping the oldest document of each group
+        ids_to_remove = []
+        for group in groups.values():
+            content = documents[group[0]]
+            logger.info(f"Found {len(group)} duplicates for content: {content[:100]}...")
+            
+            keep = min(
+                group,
+                key=lambda idx: (metadatas[idx].get('timestamp', '1970-01-01T00:00:00'), ids[idx])
+            )
+            ids_to_remove.extend(ids[idx] for idx in group if idx != keep)
+        
+        # Remove all duplicates in a few large deletes rather than one per group
+        delete_batch_size = 2000
+        logger.info(f"Removing {len(ids_to_remove)} duplicate IDs")
+        for i in range(0, len(ids_to_remove), delete_batch_size):
+            collection.delete(ids=ids_to_remove[i:i + delete_batch_size])
+        duplicates_removed = len(ids_to_remove)
         
         logger.info(f"Cleanup complete. Removed {duplicates_removed} duplicate documents")
         
@@ -82,11 +87,9 @@ def cleanup_duplicates():
 
 def verify_collection_health():
     """Verify the collection is healthy after cleanup."""
-    chroma_path = CHROMA_PATH
-    client = chromadb.PersistentClient(path=chroma_path)
-    
     try:
-        collection = client.get_collection("memory_collection")
+        # Reuses the client opened by cleanup_duplicates()
+        collection = get_collection(CHROMA_PATH)
         
         # Test basic operations
         test_id = f"health_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -65,7 +65,7 @@ async def cleanup_memories(error_text=None, dry_run=False, reset=False):
     # Get all memory entries
     try:
         # Query all entries
-        result = storage.collection.get()
+        result = storage.collection.get(include=["documents"])
         total_memories = len(result['ids']) if 'ids' in result else 0
         logger.info(f"Found {total_memories} total memories in the database")
         
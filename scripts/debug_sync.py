@@ -5,15 +5,19 @@ This script helps diagnose issues during repository synchronization.
 """
 
 import asyncio
+import atexit
+import copy
 import json
 import logging
 import os
+import queue
 import sys
 import time
-import traceback
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -30,40 +34,67 @@ except ImportError as e:
     print("Please ensure you're running from the mcp-memory-service directory")
     sys.exit(1)
 
-# Configure logging
+from _lock_watch import is_lock_held, watch_lock_file
+
+# orjson is much faster at encoding the report and health dumps; fall back to
+# the stdlib when it is missing
+try:
+    import orjson
+    
+    def dumps_pretty(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def dumps_pretty(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
+# Configure logging. Records are formatted by the QueueHandler and written
+# to stdout and the log file by a listener thread, so logging never blocks
+# the event loop on I/O.
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.DEBUG,
     format=LOG_FORMAT,
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('debug_sync.log', mode='w')
-    ]
+    handlers=[QueueHandler(log_queue)]
 )
+log_listener = QueueListener(
+    log_queue,
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('debug_sync.log', mode='w')
+)
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class SyncMetrics:
+    """Counters and timings collected during a debug sync."""
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    duration: Optional[float] = None
+    files_processed: int = 0
+    chunks_created: int = 0
+    store_batches: int = 0
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    lock_acquisitions: int = 0
+    lock_releases: int = 0
+    retries: int = 0
+
 class SyncDebugger:
     """Debug harness for repository sync operations."""
     
-    def __init__(self):
+    def __init__(self, store_batch_size: int = 256):
         self.chroma_path = CHROMA_PATH
+        self.lock_path = Path(self.chroma_path) / '.chroma.lock'
+        self.store_batch_size = store_batch_size
         self.code_collection_name = CODE_COLLECTION_NAME
         self.storage = None
         self.code_storage = None
         self.start_time = None
-        self.metrics = {
-            'start_time': None,
-            'end_time': None,
-            'duration': None,
-            'files_processed': 0,
-            'chunks_created': 0,
-            'errors': [],
-            'warnings': [],
-            'lock_acquisitions': 0,
-            'lock_releases': 0,
-            'retries': 0
-        }
+        self._last_lock_state = None
+        self.metrics = SyncMetrics()
         
     async def init_storage(self):
         """Initialize storage with debug logging."""
@@ -73,55 +104,49 @@ class SyncDebugger:
             self.storage = ChromaMemoryStorage(str(self.chroma_path))
             logger.info(f"Memory storage initialized at: {self.chroma_path}")
             
-            # Initialize code collection storage for code intelligence
-            self.code_storage = ChromaMemoryStorage(str(self.chroma_path))
-            # Switch to code collection
-            self.code_storage.collection = self.code_storage.client.get_or_create_collection(
+            # Code storage is a shallow copy pointed at the code collection, so it
+            # shares the client, embedding model and lock instead of loading them again
+            self.code_storage = copy.copy(self.storage)
+            self.code_storage.collection = self.storage.client.get_or_create_collection(
                 name=self.code_collection_name,
-                embedding_function=self.code_storage.embedding_function
+                embedding_function=self.storage.embedding_function
             )
             logger.info(f"Code storage initialized with collection: {self.code_collection_name}")
             
             # Check database health
             health = await self.storage.check_health()
-            logger.info(f"Database health: {json.dumps(health, indent=2)}")
+            logger.info(f"Database health: {dumps_pretty(health).decode()}")
             
         except Exception as e:
-            logger.error(f"Failed to initialize storage: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception("Failed to initialize storage: %s", e)
             raise
     
-    async def monitor_lock_file(self):
-        """Monitor lock file status."""
-        lock_path = self.chroma_path / '.chroma.lock'
-        
-        while True:
-            if lock_path.exists():
-                stat = lock_path.stat()
-                logger.debug(f"Lock file exists - Size: {stat.st_size}, "
-                           f"Modified: {datetime.fromtimestamp(stat.st_mtime)}")
-                
-                # Check if lock is held
-                try:
-                    import fcntl
-                    with open(lock_path, 'r') as f:
-                        try:
-                            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-                            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                            logger.debug("Lock file is not actively locked")
-                        except IOError:
-                            logger.debug("Lock file is actively locked by another process")
-                except Exception as e:
-                    logger.debug(f"Error checking lock status: {e}")
+    def log_lock_status(self):
+        """Log the lock file status when it differs from the last one seen."""
+        try:
+            if not self.lock_path.exists():
+                state = "Lock file does not exist"
+            elif is_lock_held(self.lock_path):
+                state = "Lock file is actively locked by another process"
             else:
-                logger.debug("Lock file does not exist")
-            
-            await asyncio.sleep(1)
+                state = "Lock file is not actively locked"
+        except Exception as e:
+            logger.debug(f"Error checking lock status: {e}")
+            return
+        
+        if state != self._last_lock_state:
+            self._last_lock_state = state
+            logger.debug(state)
+    
+    async def monitor_lock_file(self):
+        """Monitor lock file status, re-probing only when the lock file changes."""
+        # Without inotify, fall back to probing at most every 10 seconds
+        await watch_lock_file(self.lock_path, self.log_lock_status, poll_interval=10.0)
     
     async def sync_repository_with_monitoring(self, repo_path: str, repo_name: str):
         """Sync repository with detailed monitoring."""
         self.start_time = time.time()
-        self.metrics['start_time'] = datetime.now().isoformat()
+        self.metrics.start_time = datetime.now().isoformat()
         
         # Start lock monitoring in background
         monitor_task = asyncio.create_task(self.monitor_lock_file())
@@ -132,27 +157,33 @@ class SyncDebugger:
             # Initialize metrics if needed
             initialize_metrics()
             
-            # Create batch processor with debug logging
+            # Create batch processor with debug logging; chunks reach storage
+            # in store_many batches of chunk_size
             batch_processor = BatchProcessor(
                 storage=self.code_storage,
-                max_workers=2  # Reduce workers for easier debugging
+                max_workers=2,  # Reduce workers for easier debugging
+                chunk_size=self.store_batch_size
             )
             
-            # Hook into storage events
-            original_store = self.code_storage.add_memory
-            async def logged_store(*args, **kwargs):
-                self.metrics['chunks_created'] += 1
-                logger.debug(f"Storing chunk #{self.metrics['chunks_created']}")
-                return await original_store(*args, **kwargs)
-            self.code_storage.add_memory = logged_store
+            # Hook into storage events once per batch rather than once per chunk
+            original_store_many = self.code_storage.store_many
+            async def logged_store_many(memories):
+                metrics = self.metrics
+                n = metrics.store_batches + 1
+                metrics.store_batches = n
+                metrics.chunks_created += len(memories)
+                # Log only at power-of-two batch counts (1, 2, 4, 8, ...)
+                if n & (n - 1) == 0:
+                    logger.debug("Storing batch #%d (%d chunks so far)", n, metrics.chunks_created)
+                return await original_store_many(memories)
+            self.code_storage.store_many = logged_store_many
             
             # Process repository
             logger.info("Starting batch processing...")
             result = await batch_processor.process_repository(
                 repository_path=repo_path,
                 repository_name=repo_name,
-                store_results=True,
-                generate_report=True
+                store_results=True
             )
             
             logger.info(f"Batch processing completed: {result}")
@@ -160,16 +191,15 @@ class SyncDebugger:
             # Get final metrics
             if hasattr(batch_processor, 'metrics_collector'):
                 metrics = batch_processor.metrics_collector.get_metrics('summary')
-                logger.info(f"Processing metrics: {json.dumps(metrics, indent=2)}")
+                logger.info(f"Processing metrics: {dumps_pretty(metrics).decode()}")
             
         except asyncio.CancelledError:
             logger.warning("Sync operation was cancelled")
-            self.metrics['errors'].append("Operation cancelled")
+            self.metrics.errors.append("Operation cancelled")
             raise
         except Exception as e:
-            logger.error(f"Sync failed: {e}")
-            logger.error(traceback.format_exc())
-            self.metrics['errors'].append(str(e))
+            logger.exception("Sync failed: %s", e)
+            self.metrics.errors.append(str(e))
             raise
         finally:
             # Stop monitoring
@@ -180,8 +210,8 @@ class SyncDebugger:
                 pass
             
             # Record final metrics
-            self.metrics['end_time'] = datetime.now().isoformat()
-            self.metrics['duration'] = time.time() - self.start_time
+            self.metrics.end_time = datetime.now().isoformat()
+            self.metrics.duration = time.time() - self.start_time
             
             # Save debug report
             self.save_debug_report()
@@ -190,8 +220,13 @@ class SyncDebugger:
         """Save debug report to file."""
         report_path = Path('debug_sync_report.json')
         
-        with open(report_path, 'w') as f:
-            json.dump(self.metrics, f, indent=2)
+        # Serialize fully before touching the file, then swap it in atomically
+        # so an interrupted run never leaves a truncated report behind
+        report = dumps_pretty(asdict(self.metrics))
+        tmp_path = report_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(report)
+        os.replace(tmp_path, report_path)
         
         logger.info(f"Debug report saved to: {report_path}")
         
@@ -199,13 +234,13 @@ class SyncDebugger:
         print("\n" + "="*60)
         print("SYNC DEBUG SUMMARY")
         print("="*60)
-        print(f"Duration: {self.metrics['duration']:.2f} seconds")
-        print(f"Files processed: {self.metrics['files_processed']}")
-        print(f"Chunks created: {self.metrics['chunks_created']}")
-        print(f"Errors: {len(self.metrics['errors'])}")
-        if self.metrics['errors']:
+        print(f"Duration: {self.metrics.duration:.2f} seconds")
+        print(f"Files processed: {self.metrics.files_processed}")
+        print(f"Chunks created: {self.metrics.chunks_created}")
+        print(f"Errors: {len(self.metrics.errors)}")
+        if self.metrics.errors:
             print("\nErrors encountered:")
-            for error in self.metrics['errors']:
+            for error in self.metrics.errors:
                 print(f"  - {error}")
         print("="*60)
 
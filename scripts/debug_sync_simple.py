@@ -4,82 +4,71 @@ Simple debug script for MCP memory sync - tracks what happens during sync.
 """
 
 import asyncio
+import atexit
 import json
 import logging
 import os
+import queue
 import sys
-import time
-import traceback
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-# Configure logging
+import psutil
+
+from _lock_watch import is_lock_held, watch_lock_file
+
+# Configure logging. Records are formatted by the QueueHandler and written
+# to stdout and the log file by a listener thread, so logging never blocks
+# the event loop on I/O.
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+log_queue = queue.Queue(-1)
 logging.basicConfig(
     level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('debug_sync_simple.log', mode='w')
-    ]
+    format=LOG_FORMAT,
+    handlers=[QueueHandler(log_queue)]
+)
+log_listener = QueueListener(
+    log_queue,
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('debug_sync_simple.log', mode='w')
 )
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
+def log_chromadb_lock(lock_path: Path):
+    """Log the current ChromaDB lock file status."""
+    if lock_path.exists():
+        try:
+            stat = lock_path.stat()
+            lock_status = "LOCKED" if is_lock_held(lock_path) else "NOT LOCKED"
+            
+            logger.info(f"Lock file: EXISTS - Size: {stat.st_size} - Status: {lock_status}")
+        except Exception as e:
+            logger.error(f"Error checking lock: {e}")
+    else:
+        logger.info("Lock file: DOES NOT EXIST")
+
 async def monitor_chromadb_lock(duration: int = 30):
-    """Monitor ChromaDB lock file for a specified duration."""
+    """Monitor ChromaDB lock file for a specified duration, logging each change."""
     lock_path = Path.home() / '.local' / 'share' / 'mcp-memory' / 'chroma_db' / '.chroma.lock'
     logger.info(f"Monitoring lock file: {lock_path}")
     
-    start_time = time.time()
-    
-    while time.time() - start_time < duration:
-        if lock_path.exists():
-            try:
-                stat = lock_path.stat()
-                # Check if file is locked
-                with open(lock_path, 'r') as f:
-                    import fcntl
-                    try:
-                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                        lock_status = "NOT LOCKED"
-                    except IOError:
-                        lock_status = "LOCKED"
-                
-                logger.info(f"Lock file: EXISTS - Size: {stat.st_size} - Status: {lock_status}")
-            except Exception as e:
-                logger.error(f"Error checking lock: {e}")
-        else:
-            logger.info("Lock file: DOES NOT EXIST")
-        
-        await asyncio.sleep(1)
+    await watch_lock_file(lock_path, lambda: log_chromadb_lock(lock_path), duration=duration)
 
-async def test_mcp_sync():
-    """Test memory sync via direct MCP call."""
-    import subprocess
+async def run_mcp_sync(test_repo: str, repo_name: str):
+    """Call sync_repository on a memory server through an MCP stdio session."""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
     
-    # Start monitoring in background
-    monitor_task = asyncio.create_task(monitor_chromadb_lock(60))
-    
-    # Prepare test repository
-    test_repo = sys.argv[1] if len(sys.argv) > 1 else "/home/felipe/mcp-memory-service"
-    repo_name = Path(test_repo).name
-    
-    logger.info(f"Testing sync for: {test_repo}")
-    
-    # Create a simple Python script that calls MCP memory sync
-    test_script = f"""
-import asyncio
-import json
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-
-async def main():
-    # Connect to memory server
+    # Start the server module with this interpreter rather than through uv
+    src_path = Path(__file__).resolve().parent.parent / 'src'
     server_params = StdioServerParameters(
-        command="uv",
-        args=["--directory", "/home/felipe/mcp-memory-service", "run", "memory"],
-        env=None
+        command=sys.executable,
+        args=["-m", "mcp_memory_service.server"],
+        env={**os.environ, "PYTHONPATH": str(src_path)}
     )
     
     async with stdio_client(server_params) as (read, write):
@@ -87,53 +76,46 @@ async def main():
             await session.initialize()
             
             # List repositories before
-            print("BEFORE:", await session.call_tool("list_repositories", {{}}))
+            logger.info(f"BEFORE: {await session.call_tool('list_repositories', {})}")
             
             # Try to sync
-            print("Starting sync...")
+            logger.info("Starting sync...")
             try:
                 result = await asyncio.wait_for(
-                    session.call_tool("sync_repository", {{
-                        "repository_path": "{test_repo}",
-                        "repository_name": "{repo_name}",
+                    session.call_tool("sync_repository", {
+                        "repository_path": test_repo,
+                        "repository_name": repo_name,
                         "incremental": True
-                    }}),
+                    }),
                     timeout=30
                 )
-                print("SYNC RESULT:", result)
+                logger.info(f"SYNC RESULT: {result}")
             except asyncio.TimeoutError:
-                print("SYNC TIMEOUT after 30 seconds")
+                logger.error("SYNC TIMEOUT after 30 seconds")
             
             # List repositories after
-            print("AFTER:", await session.call_tool("list_repositories", {{}}))
+            logger.info(f"AFTER: {await session.call_tool('list_repositories', {})}")
 
-asyncio.run(main())
-"""
+async def test_mcp_sync():
+    """Test memory sync via direct MCP call."""
+    # Start monitoring in background
+    monitor_task = asyncio.create_task(monitor_chromadb_lock(60))
+    
+    # Prepare test repository
+    test_repo = sys.argv[1] if len(sys.argv) > 1 else "/home/felipe/mcp-memory-service"
+    repo_name = Path(test_repo).name
     
-    # Write test script
-    test_script_path = Path("test_sync_runner.py")
-    test_script_path.write_text(test_script)
+    logger.info(f"Testing sync for: {test_repo}")
     
-    # Run the test script in a subprocess
+    # Run the MCP session in this event loop
     logger.info("Running MCP sync test...")
-    proc = await asyncio.create_subprocess_exec(
-        sys.executable,
-        str(test_script_path),
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    
-    # Wait for completion or timeout
     try:
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=45)
-        logger.info(f"Test completed with code: {proc.returncode}")
-        logger.info(f"STDOUT:\n{stdout.decode()}")
-        if stderr:
-            logger.error(f"STDERR:\n{stderr.decode()}")
+        await asyncio.wait_for(run_mcp_sync(test_repo, repo_name), timeout=45)
+        logger.info("Test completed")
     except asyncio.TimeoutError:
-        logger.error("Test script timed out after 45 seconds")
-        proc.terminate()
-        await proc.wait()
+        logger.error("Test timed out after 45 seconds")
+    except Exception as e:
+        logger.exception("Test failed: %s", e)
     
     # Stop monitoring
     monitor_task.cancel()
@@ -141,22 +123,14 @@ asyncio.run(main())
         await monitor_task
     except asyncio.CancelledError:
         pass
-    
-    # Cleanup
-    test_script_path.unlink(missing_ok=True)
 
 async def check_processes():
     """Check for memory-related processes."""
-    proc = await asyncio.create_subprocess_exec(
-        'ps', 'aux',
-        stdout=asyncio.subprocess.PIPE
-    )
-    stdout, _ = await proc.communicate()
-    
     logger.info("Memory-related processes:")
-    for line in stdout.decode().split('\n'):
-        if 'memory' in line and 'grep' not in line:
-            logger.info(f"  {line.strip()}")
+    for proc in psutil.process_iter(['pid', 'cmdline']):
+        cmd = ' '.join(proc.info['cmdline'] or ())
+        if 'memory' in cmd:
+            logger.info("  pid=%d %s", proc.info['pid'], cmd)
 
 async def main():
     """Main debug function."""
@@ -11,7 +11,6 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from mcp_memory_service.code_intelligence.chunker.factory import ChunkerFactory
-from mcp_memory_service.code_intelligence.chunker.base import GenericChunker
 
 def extend_supported_file_types():
     """Add support for additional file types using the GenericChunker."""
@@ -99,27 +98,17 @@ def extend_supported_file_types():
         '.bib': 'bibtex',
     }
     
-    # Create generic chunkers for each file type
-    for ext, lang in additional_extensions.items():
-        # Create a custom chunker class for this language
-        class_name = f"{lang.capitalize()}Chunker"
-        
-        # Dynamically create a chunker class
-        chunker_class = type(class_name, (GenericChunker,), {
-            '__init__': lambda self, lang=lang: (
-                super(type(self), self).__init__(),
-                setattr(self, 'language_name', lang)
-            )
-        })
-        
-        # Register the chunker
-        extensions = [ext] if ext.startswith('.') else []
-        ChunkerFactory.register_chunker(lang, chunker_class, extensions=extensions)
-    
+    # Register every extension in one pass; these languages all share GenericChunker
+    ChunkerFactory.register_languages(
+        (lang, [ext] if ext.startswith('.') else [])
+        for ext, lang in additional_extensions.items()
+    )
+
     # Print summary
     print(f"Successfully registered {len(additional_extensions)} additional file types")
-    print(f"\nTotal supported extensions: {len(ChunkerFactory.get_supported_extensions())}")
-    print(f"Supported extensions: {sorted(ChunkerFactory.get_supported_extensions())}")
+    supported_extensions = ChunkerFactory.get_supported_extensions()
+    print(f"\nTotal supported extensions: {len(supported_extensions)}")
+    print(f"Supported extensions: {sorted(supported_extensions)}")
 
 if __name__ == "__main__":
     extend_supported_file_types()
\ No newline at end of file
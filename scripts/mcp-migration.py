@@ -131,7 +131,7 @@ def migrate_memories(source_type, source_config, target_type, target_config):
         print(f"Found {len(results['ids'])} memories to migrate")
         
         # Check for existing memories in target to avoid duplicates
-        target_existing = target_collection.get()
+        target_existing = target_collection.get(include=[])
         existing_ids = set(target_existing["ids"])
         
         # Filter out already migrated memories
@@ -176,7 +176,7 @@ def migrate_memories(source_type, source_config, target_type, target_config):
         print("\nMigration complete!")
         
         # Verify migration
-        target_results = target_collection.get()
+        target_results = target_collection.get(include=[])
         print(f"Verification: {len(target_results['ids'])} total memories in target collection")
         
     except Exception as e:
@@ -3,21 +3,57 @@
 Script to rebuild the ChromaDB database from scratch.
 This can fix corruption issues and segmentation faults.
 """
+import argparse
 import os
 import sys
 import shutil
 import chromadb
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import logging
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from mcp_memory_service.config import CHROMA_PATH, BACKUPS_PATH
+from mcp_memory_service.utils.system_detection import get_torch_device
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# ioctl request that asks the filesystem for a copy-on-write clone (Linux)
+FICLONE = 0x40049409
+
+def _reflink_copy(src, dst):
+    """Clone src to dst copy-on-write where the filesystem supports it, else copy the bytes."""
+    try:
+        import fcntl
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return dst
+    except (ImportError, OSError):
+        # Not Linux, or the filesystem cannot reflink (ext4, tmpfs, across devices)
+        return shutil.copy2(src, dst)
+
+@lru_cache(maxsize=None)
+def get_embedding_function():
+    """Return the embedding function, loading the model only once per run."""
+    from chromadb.utils import embedding_functions
+    device = get_torch_device()
+    embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name="all-mpnet-base-v2",
+        device=device
+    )
+    
+    # Half precision roughly doubles encode throughput on CUDA; CPU kernels
+    # gain little from it, so the model stays FP32 there
+    if device == "cuda":
+        embedding_function._model.half()
+    
+    return embedding_function
+
 def backup_database():
     """Create a backup of the current database."""
     if not os.path.exists(CHROMA_PATH):
@@ -28,36 +64,28 @@ def backup_database():
     backup_path = os.path.join(BACKUPS_PATH, f"chroma_backup_{timestamp}")
     
     logger.info(f"Creating backup at: {backup_path}")
-    shutil.copytree(CHROMA_PATH, backup_path)
+    # On btrfs, XFS and other reflink-capable filesystems this shares blocks
+    # with the database instead of copying them
+    shutil.copytree(CHROMA_PATH, backup_path, copy_function=_reflink_copy)
     logger.info("Backup created successfully")
     
     return backup_path
 
-def export_data():
-    """Export all data from the current database."""
-    logger.info("Attempting to export data from current database...")
-    
-    try:
-        client = chromadb.PersistentClient(path=CHROMA_PATH)
-        collection = client.get_collection("memory_collection")
-        
-        # Get all data
-        logger.info("Fetching all documents...")
-        data = collection.get(include=["metadatas", "documents"])
-        
-        if data['ids']:
-            logger.info(f"Exported {len(data['ids'])} documents")
-            return data
-        else:
-            logger.info("No data to export")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Failed to export data: {str(e)}")
-        return None
+def iter_export(source_path, page_size=1000):
+    """Yield the documents of the database at source_path one page at a time."""
+    client = chromadb.PersistentClient(path=source_path)
+    collection = client.get_collection("memory_collection")
+    
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas", "documents"], limit=page_size, offset=offset)
+        if not page['ids']:
+            return
+        yield page
+        offset += len(page['ids'])
 
-def rebuild_database(exported_data=None):
-    """Rebuild the database from scratch."""
+def rebuild_database(source_path=None):
+    """Rebuild the database from scratch, reimporting the data from source_path if given."""
     logger.info("Rebuilding database...")
     
     # Remove old database
@@ -65,27 +93,13 @@ def rebuild_database(exported_data=None):
         logger.info(f"Removing old database at: {CHROMA_PATH}")
         shutil.rmtree(CHROMA_PATH)
     
-    # Create new database
+    # Create new database; the client creates the directory itself, and
+    # since it starts empty the collection can be created straight away
     logger.info("Creating new database...")
-    os.makedirs(CHROMA_PATH, exist_ok=True)
-    
-    # Initialize new client
     client = chromadb.PersistentClient(path=CHROMA_PATH)
     
     # Create collection with proper settings
-    from chromadb.utils import embedding_functions
-    embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-mpnet-base-v2"
-    )
-    
-    try:
-        # Try to get existing collection first
-        collection = client.get_collection("memory_collection")
-        logger.warning("Collection already exists, deleting it...")
-        client.delete_collection("memory_collection")
-    except Exception:
-        # Collection doesn't exist, that's fine
-        pass
+    embedding_function = get_embedding_function()
     
     collection = client.create_collection(
         name="memory_collection",
@@ -94,62 +108,85 @@ def rebuild_database(exported_data=None):
     
     logger.info("New database created successfully")
     
-    # Reimport data if available
-    if exported_data and exported_data['ids']:
-        logger.info(f"Reimporting {len(exported_data['ids'])} documents...")
+    # Reimport data page by page, so only one page is ever held in memory.
+    # Embeddings are computed once per page on a worker thread and passed to
+    # add(), so the next page is encoded while the current one is written.
+    if source_path:
+        logger.info(f"Reimporting documents from: {source_path}")
         
-        # Import in batches to avoid issues
-        batch_size = 100
-        total = len(exported_data['ids'])
+        imported = 0
         
-        for i in range(0, total, batch_size):
-            end = min(i + batch_size, total)
-            batch_ids = exported_data['ids'][i:end]
-            batch_docs = exported_data['documents'][i:end]
-            batch_meta = exported_data['metadatas'][i:end]
-            
+        def add_page(page_number, page, embeddings):
             try:
                 collection.add(
-                    ids=batch_ids,
-                    documents=batch_docs,
-                    metadatas=batch_meta
+                    ids=page['ids'],
+                    documents=page['documents'],
+                    metadatas=page['metadatas'],
+                    embeddings=embeddings.result()
                 )
-                logger.info(f"Imported batch {i//batch_size + 1}/{(total + batch_size - 1)//batch_size}")
+                logger.info(f"Imported page {page_number} ({imported + len(page['ids'])} documents so far)")
+                return len(page['ids'])
             except Exception as e:
-                logger.error(f"Error importing batch: {str(e)}")
+                logger.error(f"Error importing page: {str(e)}")
+                return 0
+        
+        try:
+            with ThreadPoolExecutor(max_workers=1) as encoder:
+                pending = None
+                for page_number, page in enumerate(iter_export(source_path, page_size=512), 1):
+                    embeddings = encoder.submit(embedding_function, page['documents'])
+                    if pending:
+                        imported += add_page(*pending)
+                    pending = (page_number, page, embeddings)
+                if pending:
+                    imported += add_page(*pending)
+        except Exception as e:
+            logger.error(f"Failed to export data: {str(e)}")
         
-        logger.info("Data reimport completed")
+        if imported:
+            logger.info(f"Data reimport completed: {imported} documents")
+        else:
+            logger.info("No data to reimport")
     
     return True
 
-def verify_new_database():
-    """Verify the new database is working correctly."""
+def verify_new_database(deep=False):
+    """Verify the new database is working correctly.
+    
+    By default only checks that the client responds and the collection can be
+    counted; deep=True also runs an add/query/delete round trip.
+    """
     logger.info("Verifying new database...")
     
     try:
         client = chromadb.PersistentClient(path=CHROMA_PATH)
-        collection = client.get_collection("memory_collection")
+        client.heartbeat()
+        collection = client.get_collection(
+            "memory_collection",
+            embedding_function=get_embedding_function()
+        )
         
         # Check count
         count = collection.count()
         logger.info(f"Collection has {count} documents")
         
-        # Test operations
-        test_id = f"verify_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        collection.add(
-            ids=[test_id],
-            documents=["Verification test"],
-            metadatas=[{"test": True}]
-        )
-        
-        # Query
-        results = collection.query(
-            query_texts=["Verification test"],
-            n_results=1
-        )
-        
-        # Cleanup
-        collection.delete(ids=[test_id])
+        if deep:
+            # Test operations
+            test_id = f"verify_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            collection.add(
+                ids=[test_id],
+                documents=["Verification test"],
+                metadatas=[{"test": True}]
+            )
+            
+            # Query
+            results = collection.query(
+                query_texts=["Verification test"],
+                n_results=1
+            )
+            
+            # Cleanup
+            collection.delete(ids=[test_id])
         
         logger.info("Database verification successful")
         return True
@@ -159,6 +196,11 @@ def verify_new_database():
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the ChromaDB database from scratch")
+    parser.add_argument("--deep-verify", action="store_true",
+                        help="verify the rebuilt database with an add/query/delete round trip")
+    args = parser.parse_args()
+    
     logger.info("ChromaDB Database Rebuild Tool")
     logger.info("=" * 50)
     
@@ -175,15 +217,12 @@ if __name__ == "__main__":
     if backup_path:
         logger.info(f"Backup saved to: {backup_path}")
     
-    # Step 2: Export data
-    exported_data = export_data()
-    
-    # Step 3: Rebuild
-    success = rebuild_database(exported_data)
+    # Step 2: Rebuild, streaming the data back in from the backup
+    success = rebuild_database(backup_path)
     
     if success:
-        # Step 4: Verify
-        if verify_new_database():
+        # Step 3: Verify
+        if verify_new_database(deep=args.deep_verify):
             logger.info("\n✅ Database rebuild completed successfully!")
         else:
             logger.error("\n❌ Database rebuild completed but verification failed")
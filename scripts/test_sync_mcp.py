@@ -5,11 +5,16 @@ This simulates what happens when sync_repository is called via MCP.
 """
 
 import asyncio
+import atexit
+import contextlib
 import json
 import logging
+import os
+import queue
 import signal
 import sys
 import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # Add parent directory to path
@@ -18,15 +23,34 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-# Configure logging
+# Scoped timeouts cancel the awaited call in place, without the wrapper task
+# that asyncio.wait_for creates per call
+try:
+    from asyncio import timeout as time_limit  # Python 3.11+
+except ImportError:
+    import anyio
+    
+    @contextlib.asynccontextmanager
+    async def time_limit(delay):
+        with anyio.fail_after(delay):
+            yield
+
+# Configure logging. DEBUG output is opt-in via MCP_TEST_DEBUG; records are
+# formatted by the QueueHandler and written to stdout and the log file by a
+# listener thread, so logging never blocks the event loop on I/O.
+log_queue = queue.Queue(-1)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.DEBUG if os.environ.get('MCP_TEST_DEBUG') else logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('test_sync_mcp.log', mode='w')
-    ]
+    handlers=[QueueHandler(log_queue)]
 )
+log_listener = QueueListener(
+    log_queue,
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('test_sync_mcp.log', mode='w')
+)
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
@@ -37,35 +61,6 @@ class MCPSyncTester:
         self.session = None
         self.interrupted = False
         
-    async def connect_to_memory_server(self):
-        """Connect to the memory MCP server."""
-        logger.info("Connecting to memory MCP server...")
-        
-        # Find the memory server command
-        memory_cmd = ["uv", "--directory", "/home/felipe/mcp-memory-service", "run", "memory"]
-        
-        server_params = StdioServerParameters(
-            command=memory_cmd[0],
-            args=memory_cmd[1:],
-            env=None
-        )
-        
-        # Start client connection
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                self.session = session
-                
-                # Initialize
-                await session.initialize()
-                logger.info("Connected to memory server")
-                
-                # List available tools
-                tools = await session.list_tools()
-                logger.info(f"Available tools: {[t.name for t in tools.tools]}")
-                
-                # Keep session alive for testing
-                return session
-    
     async def test_sync_with_timeout(self, repo_path: str, repo_name: str, timeout: int = 30):
         """Test sync operation with timeout and monitoring."""
         logger.info(f"Testing sync for {repo_name} at {repo_path} with {timeout}s timeout")
@@ -73,18 +68,14 @@ class MCPSyncTester:
         try:
             # First check system health
             logger.info("Checking system health...")
-            health_result = await asyncio.wait_for(
-                self.session.call_tool("get_system_health", {"include_history": False}),
-                timeout=5
-            )
+            async with time_limit(5):
+                health_result = await self.session.call_tool("get_system_health", {"include_history": False})
             logger.info(f"System health: {health_result}")
             
             # List current repositories
             logger.info("Listing current repositories...")
-            repos_result = await asyncio.wait_for(
-                self.session.call_tool("list_repositories", {}),
-                timeout=5
-            )
+            async with time_limit(5):
+                repos_result = await self.session.call_tool("list_repositories", {})
             logger.info(f"Current repositories: {repos_result}")
             
             # Start sync with monitoring
@@ -105,29 +96,24 @@ class MCPSyncTester:
             monitor_interval = 2  # seconds
             elapsed = 0
             
-            while not sync_task.done() and elapsed < timeout:
-                await asyncio.sleep(monitor_interval)
+            while elapsed < timeout:
+                # Wake up as soon as the sync finishes rather than at the next tick
+                done, _ = await asyncio.wait({sync_task}, timeout=min(monitor_interval, timeout - elapsed))
                 elapsed = time.time() - start_time
+                if done:
+                    break
                 logger.info(f"Sync in progress... ({elapsed:.1f}s elapsed)")
                 
                 # Check if we can get status (might timeout if sync is blocking)
                 try:
-                    status_task = asyncio.create_task(
-                        self.session.call_tool("get_repository_status", {
+                    # Wait briefly for status
+                    async with time_limit(1):
+                        status = await self.session.call_tool("get_repository_status", {
                             "repository_name": repo_name
                         })
-                    )
-                    
-                    # Wait briefly for status
-                    done, pending = await asyncio.wait([status_task], timeout=1)
-                    
-                    if done:
-                        status = await status_task
-                        logger.info(f"Repository status: {status}")
-                    else:
-                        logger.warning("Status check timed out (sync might be blocking)")
-                        status_task.cancel()
-                        
+                    logger.info(f"Repository status: {status}")
+                except TimeoutError:
+                    logger.warning("Status check timed out (sync might be blocking)")
                 except Exception as e:
                     logger.debug(f"Could not get status: {e}")
             
@@ -149,7 +135,7 @@ class MCPSyncTester:
             final_repos = await self.session.call_tool("list_repositories", {})
             logger.info(f"Final repositories: {final_repos}")
             
-        except asyncio.TimeoutError:
+        except TimeoutError:
             logger.error("Operation timed out")
         except Exception as e:
             logger.error(f"Test failed: {e}")
@@ -210,5 +196,14 @@ async def main():
         traceback.print_exc()
         sys.exit(1)
 
+def _install_fast_event_loop() -> None:
+    """Use uvloop when it is installed; the default loop is kept elsewhere (e.g. Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+
 if __name__ == "__main__":
+    _install_fast_event_loop()
     asyncio.run(main())
\ No newline at end of file
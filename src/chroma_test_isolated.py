@@ -155,7 +155,7 @@ class ChromaMemoryStorage:
     async def store(self, memory: Memory) -> Tuple[bool, Optional[str]]:
         """Stores a memory in ChromaDB."""
         try:
-            existing = self.collection.get(where={"content_hash": memory.content_hash})
+            existing = self.collection.get(where={"content_hash": memory.content_hash}, include=[])
             if existing["ids"]:
                 return False, "Duplicate content detected."
 
@@ -477,7 +477,7 @@ async def main():
 
     await storage.cleanup()
     logger.info("Cleanup complete")
-    results = storage.collection.get()
+    results = storage.collection.get(include=[])
     logger.info(f"Collection size after cleanup: {len(results.get('ids', []))}")
 
     assert err == None, f'Expected no error, but got {err}'
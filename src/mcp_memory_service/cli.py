@@ -5,16 +5,32 @@ Provides command-line access to code intelligence features.
 """
 import asyncio
 import argparse
+import functools
 import sys
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from .enhanced_server import EnhancedMemoryServer
-from .code_intelligence.chunker.factory import ChunkerFactory
+from .code_intelligence.chunker.factory import CHUNKER_FACTORY
+
+# Directories that are never indexed, besides hidden ones
+_EXCLUDED_DIRS = frozenset({'node_modules', '__pycache__', 'venv', 'env'})
+
+@functools.lru_cache(maxsize=1)
+def _supported_extensions() -> Tuple[str, ...]:
+    """Return the chunker-supported file suffixes, computed once per process."""
+    return tuple(CHUNKER_FACTORY.get_supported_extensions())
+
+def _write_lines(lines: Iterable[str]) -> None:
+    """Write lines to stdout with a single write and flush."""
+    text = "".join(f"{line}\n" for line in lines)
+    if text:
+        sys.stdout.write(text)
+        sys.stdout.flush()
 
 class CodeIntelligenceCLI:
     """CLI interface for code intelligence operations."""
@@ -30,29 +46,32 @@ class CodeIntelligenceCLI:
     
     async def ingest_file(self, file_path: str, repository: str = None) -> None:
         """Ingest a single file into the code intelligence system."""
-        if not os.path.exists(file_path):
+        # Read the file once here; opening it doubles as the existence check
+        try:
+            with open(file_path, 'rb') as f:
+                contents = f.read()
+        except FileNotFoundError:
             print(f"❌ Error: File not found: {file_path}")
             return
+        except OSError as e:
+            # A directory, a permission problem or another read failure
+            print(f"❌ Error: Cannot read file {file_path}: {e}")
+            return
         
         if not repository:
             repository = Path(file_path).parent.name
         
         print(f"📥 Ingesting {file_path} into repository '{repository}'...")
         
-        arguments = {
-            'file_path': file_path,
-            'repository': repository
-        }
-        
         try:
-            result = await self.server._handle_ingest_code_file(arguments)
+            result, _ = await self.server._ingest_code(file_path, repository, contents=contents)
             for content in result:
                 print(content.text)
         except Exception as e:
             print(f"❌ Error ingesting file: {e}")
     
     async def ingest_directory(self, directory: str, repository: str = None, 
-                             recursive: bool = True) -> None:
+                             recursive: bool = True, batch_size: int = 32) -> None:
         """Ingest all supported files in a directory."""
         if not os.path.exists(directory):
             print(f"❌ Error: Directory not found: {directory}")
@@ -61,62 +80,99 @@ class CodeIntelligenceCLI:
         if not repository:
             repository = Path(directory).name
         
-        # Get supported extensions
-        factory = ChunkerFactory()
-        supported_extensions = factory.get_supported_extensions()
+        # Get supported extensions; str.endswith checks a whole tuple in one call
+        supported_extensions = _supported_extensions()
         
-        # Find all supported files
-        files_to_ingest = []
+        def _iter_files():
+            """Yield supported files as the directory is scanned.
+            
+            DirEntry caches the file type from the directory listing, so most
+            entries need no separate stat call.
+            """
+            pending_dirs = [directory]
+            while pending_dirs:
+                try:
+                    with os.scandir(pending_dirs.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                # Skip common directories that shouldn't be indexed
+                                if recursive and not entry.name.startswith('.') and entry.name not in _EXCLUDED_DIRS:
+                                    pending_dirs.append(entry.path)
+                            elif entry.name.endswith(supported_extensions) and entry.is_file():
+                                yield entry.path
+                except OSError:
+                    # Unreadable directory; skip it rather than aborting the whole walk
+                    continue
         
-        if recursive:
-            for root, dirs, files in os.walk(directory):
-                # Skip common directories that shouldn't be indexed
-                dirs[:] = [d for d in dirs if not d.startswith('.') and 
-                          d not in ['node_modules', '__pycache__', 'venv', 'env']]
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if any(file.endswith(ext) for ext in supported_extensions):
-                        files_to_ingest.append(file_path)
-        else:
-            for file in os.listdir(directory):
-                file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path) and any(file.endswith(ext) for ext in supported_extensions):
-                    files_to_ingest.append(file_path)
+        # Batches of files are ingested by concurrent workers while the walk is
+        # still running; the bounded queue keeps memory independent of the tree size
+        worker_count = os.cpu_count() or 8
+        batch_size = max(1, batch_size)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * worker_count)
+        loop = asyncio.get_running_loop()
         
-        if not files_to_ingest:
-            print(f"❌ No supported files found in {directory}")
-            print(f"Supported extensions: {', '.join(supported_extensions)}")
-            return
+        def _discover() -> int:
+            """Walk the tree in a thread, handing batches of paths to the event loop with backpressure."""
+            discovered = 0
+            batch = []
+            for file_path in _iter_files():
+                batch.append(file_path)
+                discovered += 1
+                if len(batch) >= batch_size:
+                    asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                    batch = []
+            if batch:
+                asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+            return discovered
         
-        print(f"📂 Found {len(files_to_ingest)} files to ingest in '{repository}'")
+        async def producer() -> int:
+            try:
+                # The walk needs no context variables, so skip to_thread's copy_context()
+                return await loop.run_in_executor(None, _discover)
+            finally:
+                # One sentinel per worker signals shutdown
+                for _ in range(worker_count):
+                    await queue.put(None)
         
         total_chunks = 0
         successful_files = 0
         
-        for file_path in files_to_ingest:
-            try:
-                print(f"📥 Processing {os.path.relpath(file_path, directory)}...")
-                
-                arguments = {
-                    'file_path': file_path,
-                    'repository': repository
-                }
+        async def worker() -> None:
+            nonlocal total_chunks, successful_files
+            while (batch := await queue.get()) is not None:
+                # Progress lines are written and flushed once per batch, not per file
+                _write_lines(
+                    f"📥 Processing {os.path.relpath(file_path, directory)}..." for file_path in batch
+                )
                 
-                result = await self.server._handle_ingest_code_file(arguments)
-                # Extract chunk count from result text
-                result_text = result[0].text if result else ""
-                if "Successfully ingested" in result_text:
-                    chunks_line = result_text.split('\n')[0]
-                    chunk_count = int(chunks_line.split('/')[0].split()[-1])
-                    total_chunks += chunk_count
-                    successful_files += 1
+                try:
+                    # Each batch is chunked and stored with a single store_many call
+                    batch_stats = await self.server._ingest_code_files_fast(batch, repository)
+                except Exception as e:
+                    _write_lines(f"❌ Error processing {file_path}: {e}" for file_path in batch)
+                    continue
                 
-            except Exception as e:
-                print(f"❌ Error processing {file_path}: {e}")
+                errors = []
+                for file_path, stats in zip(batch, batch_stats):
+                    if stats.chunks_ok:
+                        total_chunks += stats.chunks_ok
+                        successful_files += 1
+                    errors.extend(f"❌ Error processing {file_path}: {error}" for error in stats.errors)
+                _write_lines(errors)
+        
+        print(f"📂 Ingesting supported files from {directory} into '{repository}'")
+        
+        total_files, *_ = await asyncio.gather(
+            producer(), *(worker() for _ in range(worker_count))
+        )
+        
+        if not total_files:
+            print(f"❌ No supported files found in {directory}")
+            print(f"Supported extensions: {', '.join(supported_extensions)}")
+            return
         
         print(f"\n✅ Ingestion complete:")
-        print(f"   📊 {successful_files}/{len(files_to_ingest)} files processed")
+        print(f"   📊 {successful_files}/{total_files} files processed")
         print(f"   🧩 {total_chunks} total code chunks stored")
     
     async def search_code(self, query: str, repository: str = None, 
@@ -164,18 +220,11 @@ class CodeIntelligenceCLI:
         print("📚 Available Repositories")
         
         try:
-            # Get all memories and extract unique repositories
-            results = await self.server.storage.retrieve("repository", 1000)
-            repositories = set()
-            
-            for result in results:
-                metadata = result.memory.metadata or {}
-                repo = metadata.get("repository")
-                if repo:
-                    repositories.add(repo)
-            
+            # Names come pre-sorted and distinct from the storage's repository index
+            repositories = await self.server.storage.list_repositories()
+
             if repositories:
-                for repo in sorted(repositories):
+                for repo in repositories:
                     print(f"   📂 {repo}")
             else:
                 print("   No repositories found")
@@ -280,5 +329,14 @@ async def main():
         print(f"❌ Fatal error: {e}")
         sys.exit(1)
 
+def _install_fast_event_loop() -> None:
+    """Use uvloop when it is installed; the default loop is kept elsewhere (e.g. Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    uvloop.install()
+
 if __name__ == '__main__':
+    _install_fast_event_loop()
     asyncio.run(main())
\ No newline at end of file
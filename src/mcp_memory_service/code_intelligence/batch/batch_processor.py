@@ -4,20 +4,112 @@ progress tracking, and comprehensive reporting.
 """
 
 import asyncio
+import codecs
+import contextlib
+import fnmatch
+import os
+import re
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Callable, Any
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Callable, Any
 import logging
 from collections import defaultdict
 import json
 
-from ..chunker.factory import ChunkerFactory
-from ...security.analyzer import SecurityAnalyzer, SecurityIssue, Severity
+from ..chunker.factory import CHUNKER_FACTORY
+from ...security.analyzer import SecurityAnalyzer
 from ...models.code import CodeChunk
 from ...storage.base import MemoryStorage
 
+logger = logging.getLogger(__name__)
+
+# Map extensions to languages
+_EXTENSION_MAP = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+    '.jsx': 'javascript',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.h': 'c',
+    '.hpp': 'cpp',
+    '.cs': 'csharp',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.scala': 'scala',
+    '.r': 'r',
+    '.sql': 'sql',
+    '.sh': 'bash',
+    '.bash': 'bash',
+    '.zsh': 'bash',
+    '.fish': 'bash',
+    '.ps1': 'powershell',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.json': 'json',
+    '.xml': 'xml',
+    '.html': 'html',
+    '.css': 'css',
+    '.scss': 'css',
+    '.less': 'css',
+    '.md': 'markdown',
+    '.rst': 'rst',
+    '.txt': 'text'
+}
+
+# Special files without extensions
+_NAME_MAP = {
+    'dockerfile': 'dockerfile',
+    'makefile': 'makefile',
+    'rakefile': 'ruby',
+    'gemfile': 'ruby'
+}
+
+# Files processed despite having no supported extension
+_SPECIAL_FILE_NAMES = frozenset(_NAME_MAP)
+
+# Minimum seconds between progress_callback calls during process_repository
+_PROGRESS_INTERVAL = 0.25
+
+# Per-chunk fields kept in file results. They are stored column-wise, with
+# line numbers and sizes in compact int arrays, rather than as one dict per
+# chunk; to_dict() expands them back into rows.
+_CHUNK_FIELDS = ('chunk_type', 'chunk_id', 'start_line', 'end_line', 'size')
+
+
+def _chunk_columns(chunks: List[CodeChunk]) -> Dict[str, Any]:
+    """Summarize chunks as one column per field."""
+    return {
+        'chunk_type': [chunk.chunk_type for chunk in chunks],
+        'chunk_id': [chunk.chunk_id for chunk in chunks],
+        'start_line': array('i', (chunk.start_line for chunk in chunks)),
+        'end_line': array('i', (chunk.end_line for chunk in chunks)),
+        'size': array('i', (len(chunk.text) for chunk in chunks))
+    }
+
+
+def _chunk_rows(columns: Dict[str, Any]) -> List[Dict]:
+    """Expand a column summary into one dict per chunk."""
+    return [dict(zip(_CHUNK_FIELDS, row)) for row in zip(*(columns[name] for name in _CHUNK_FIELDS))]
+
+
+def _serializable_file_result(file_result: Dict) -> Dict:
+    """Return a file result with its chunk columns expanded back into rows."""
+    return {
+        key: _chunk_rows(value) if key == 'chunks' else value
+        for key, value in file_result.items()
+    }
+
 
 @dataclass
 class BatchProgress:
@@ -64,6 +156,8 @@ class BatchResult:
     repository_path: str
     progress: BatchProgress
     file_results: Dict[str, Dict] = field(default_factory=dict)
+    # NDJSON file holding the per-file results when they were streamed to disk
+    file_results_path: Optional[str] = None
     security_summary: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
     language_summary: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
     error_summary: Dict[str, List[str]] = field(default_factory=lambda: defaultdict(list))
@@ -86,8 +180,154 @@ class BatchResult:
             'security_summary': dict(self.security_summary),
             'language_summary': dict(self.language_summary),
             'error_summary': {k: list(v) for k, v in self.error_summary.items()},
-            'file_results': self.file_results
+            'file_results': dict(self.iter_file_results())
         }
+    
+    def iter_file_results(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (file_path, file_result) pairs, reading streamed results back from disk."""
+        for file_path, file_result in self.file_results.items():
+            yield file_path, _serializable_file_result(file_result)
+        if self.file_results_path:
+            with open(self.file_results_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    file_result = json.loads(line)
+                    yield file_result['file_path'], file_result
+
+
+# Per-worker security analyzer, built once by _init_worker in each pool worker
+_worker_analyzer: Optional[SecurityAnalyzer] = None
+
+# Per-thread read buffer, reused across files and grown to the largest file
+# seen. Thread-local because the single-worker fallback runs in a thread, and
+# several batch analyses may run in one process at the same time.
+_READ_BUFFER_SIZE = 1 << 16
+_read_buffers = threading.local()
+
+
+def _init_worker() -> None:
+    """Build the per-worker analyzer; the chunker factory is already module-level."""
+    global _worker_analyzer
+    _worker_analyzer = SecurityAnalyzer()
+
+
+def _read_buffer(min_size: int, keep: int = 0) -> bytearray:
+    """Return this thread's read buffer, grown to at least min_size bytes.
+    
+    When the buffer has to grow, its first keep bytes are carried over.
+    """
+    buffer = getattr(_read_buffers, 'buffer', None)
+    if buffer is None or len(buffer) < min_size:
+        old = buffer
+        buffer = bytearray(max(min_size, _READ_BUFFER_SIZE, 2 * len(old or b'')))
+        if old is not None and keep:
+            buffer[:keep] = memoryview(old)[:keep]
+        _read_buffers.buffer = buffer
+    return buffer
+
+
+def _read_source(file_path: Path, size: Optional[int] = None) -> str:
+    """Read and decode a file through the thread's reusable buffer.
+    
+    The bytes go straight into the buffer and are decoded from there, so the
+    only allocation per file is the resulting str. size is the file size
+    recorded during collection and only sizes the buffer: the file is read to
+    EOF, so one that grew since collection is read in full.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        # One spare byte lets the read that returns EOF fit without growing
+        buffer = _read_buffer(size + 1)
+        length = 0
+        while True:
+            if length == len(buffer):
+                buffer = _read_buffer(2 * length, keep=length)
+            with memoryview(buffer) as view:
+                read = f.readinto(view[length:])
+            if not read:
+                break
+            length += read
+        with memoryview(buffer) as view, view[:length] as data:
+            # UTF-8 (with or without BOM) covers nearly every source file,
+            # and latin-1 decodes any byte sequence
+            try:
+                return str(data, 'utf-8-sig' if data[:3] == codecs.BOM_UTF8 else 'utf-8')
+            except UnicodeDecodeError:
+                return str(data, 'latin-1')
+
+
+def _process_single_file(file_path: Path, repository_name: str, file_size: Optional[int] = None) -> Dict:
+    """Process a single file and return results.
+    
+    Runs inside a pool worker, so it is a top-level function and everything it
+    returns must be picklable.
+    """
+    result = {
+        'file_path': str(file_path),
+        'chunks': _chunk_columns([]),
+        'security_issues': [],
+        'language': None,
+        'error': None,
+        'processing_time': 0
+    }
+    
+    start_time = time.time()
+    
+    try:
+        # Read file content
+        content = _read_source(file_path, file_size)
+        
+        # Determine language and get chunker
+        language = BatchProcessor._detect_language(file_path)
+        result['language'] = language
+        
+        chunker = CHUNKER_FACTORY.get_chunker(language)
+        if not chunker:
+            result['error'] = f"No chunker available for language: {language}"
+            return result
+        
+        # Chunk the file
+        chunks = chunker.chunk_content(content, str(file_path))
+        result['chunks'] = _chunk_columns(chunks)
+        
+        # Analyze security issues
+        security_issues = _worker_analyzer.analyze_code(content, language)
+        result['security_issues'] = [
+            {
+                'type': issue.issue_type,
+                'severity': issue.severity.value if hasattr(issue.severity, 'value') else str(issue.severity),
+                'message': issue.message,
+                'line_number': issue.line_number,
+                'recommendation': issue.recommendation
+            }
+            for issue in security_issues
+        ]
+        
+        # Store chunks with repository context
+        for chunk in chunks:
+            chunk.repository = repository_name
+            chunk.security_issues = security_issues
+        
+        result['chunks_created'] = len(chunks)
+        result['security_issues_found'] = len(security_issues)
+        # Handed to process_repository for storage, then dropped from the result
+        result['_chunk_objects'] = chunks
+        
+    except Exception as e:
+        result['error'] = str(e)
+        logger.error(f"Error processing file {file_path}: {e}")
+    finally:
+        result['processing_time'] = time.time() - start_time
+    
+    return result
+
+
+def _process_files(files: List[Tuple[Path, int]], repository_name: str) -> List[Tuple[Path, Dict]]:
+    """Process a group of (path, size) files in one worker call, amortizing the IPC round trip."""
+    return [
+        (file_path, _process_single_file(file_path, repository_name, file_size))
+        for file_path, file_size in files
+    ]
 
 
 class BatchProcessor:
@@ -97,7 +337,7 @@ class BatchProcessor:
         self.storage = storage
         self.max_workers = max_workers
         self.chunk_size = chunk_size
-        self.chunker_factory = ChunkerFactory()
+        self.chunker_factory = CHUNKER_FACTORY
         self.security_analyzer = SecurityAnalyzer()
         self.logger = logging.getLogger(__name__)
         
@@ -115,216 +355,141 @@ class BatchProcessor:
             '.coverage', '.tox', '.venv', 'venv', '.env', 'dist', 'build', '.idea',
             '.vscode', '.vs', '*.egg-info', '.mypy_cache', '.ruff_cache'
         }
+        # Plain names are matched exactly against each file or directory name;
+        # patterns with glob characters are compiled into one regex
+        self._excluded_names = frozenset(
+            pattern for pattern in self.exclude_patterns if not any(c in pattern for c in '*?[')
+        )
+        excluded_globs = [
+            fnmatch.translate(pattern) for pattern in self.exclude_patterns if any(c in pattern for c in '*?[')
+        ]
+        self._excluded_glob_re = re.compile('|'.join(excluded_globs)) if excluded_globs else None
+        self._extension_set = frozenset(self.supported_extensions)
+    
+    def _is_excluded(self, name: str) -> bool:
+        """Return whether a file or directory name matches an exclude pattern."""
+        name = name.lower()
+        if name in self._excluded_names:
+            return True
+        return self._excluded_glob_re is not None and self._excluded_glob_re.match(name) is not None
     
-    def _should_process_file(self, file_path: Path) -> bool:
-        """Determine if a file should be processed."""
+    def _should_process_file(self, file_path: Path, entry: Optional[os.DirEntry] = None) -> bool:
+        """Determine if a file should be processed.
+        
+        The file is only stat'ed once its name passes; given the scandir entry,
+        the entry's cached stat is used.
+        """
+        name = file_path.name.lower()
+        
         # Check extension
-        if file_path.suffix.lower() not in self.supported_extensions:
+        if file_path.suffix.lower() not in self._extension_set:
             # Also check special files without extensions
-            if file_path.name.lower() not in {'dockerfile', 'makefile', 'rakefile', 'gemfile'}:
+            if name not in _SPECIAL_FILE_NAMES:
                 return False
         
-        # Check exclusion patterns
-        for part in file_path.parts:
-            if any(pattern in part.lower() for pattern in self.exclude_patterns):
-                return False
+        # Check exclusion patterns; excluded directories are pruned by _collect_files
+        if self._is_excluded(name):
+            return False
         
         # Check file size (skip very large files > 10MB)
         try:
-            if file_path.stat().st_size > 10 * 1024 * 1024:
-                return False
+            file_size = (entry or file_path).stat().st_size
         except (OSError, IOError):
             return False
         
-        return True
-    
-    def _collect_files(self, repository_path: Path) -> List[Path]:
-        """Collect all files to process from the repository."""
-        files = []
-        try:
-            for file_path in repository_path.rglob('*'):
-                if file_path.is_file() and self._should_process_file(file_path):
-                    files.append(file_path)
-        except (OSError, IOError) as e:
-            self.logger.error(f"Error collecting files from {repository_path}: {e}")
-        
-        return sorted(files)
+        return file_size <= 10 * 1024 * 1024
     
-    def _process_single_file(self, file_path: Path, repository_name: str, 
-                           progress_callback: Optional[Callable] = None) -> Dict:
-        """Process a single file and return results."""
-        result = {
-            'file_path': str(file_path),
-            'chunks': [],
-            'security_issues': [],
-            'language': None,
-            'error': None,
-            'processing_time': 0
-        }
-        
-        start_time = time.time()
+    def _collect_files(self, repository_path: Path) -> List[Tuple[Path, int]]:
+        """Collect all files to process from the repository as (path, size) pairs.
         
-        try:
-            # Update progress if callback provided
-            if progress_callback:
-                progress_callback(current_file=str(file_path))
-            
-            # Read file content
+        Excluded directories are skipped before they are descended into, so
+        trees like node_modules or .git are never listed. The size is handed
+        to the worker so the file is not stat'ed again before it is read.
+        """
+        files = []
+        pending_dirs = [str(repository_path)]
+        while pending_dirs:
+            directory = pending_dirs.pop()
             try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-            except UnicodeDecodeError:
-                # Try with different encodings
-                for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                    try:
-                        content = file_path.read_text(encoding=encoding, errors='ignore')
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    raise UnicodeDecodeError("Unable to decode file with any encoding")
-            
-            # Determine language and get chunker
-            language = self._detect_language(file_path)
-            result['language'] = language
-            
-            chunker = self.chunker_factory.get_chunker(language)
-            if not chunker:
-                result['error'] = f"No chunker available for language: {language}"
-                return result
-            
-            # Chunk the file
-            chunks = chunker.chunk_content(content, str(file_path))
-            result['chunks'] = [
-                {
-                    'chunk_type': chunk.chunk_type,
-                    'chunk_id': chunk.chunk_id,
-                    'start_line': chunk.start_line,
-                    'end_line': chunk.end_line,
-                    'size': len(chunk.text)
-                }
-                for chunk in chunks
-            ]
-            
-            # Analyze security issues
-            security_issues = self.security_analyzer.analyze_code(content, language)
-            result['security_issues'] = [
-                {
-                    'type': issue.issue_type,
-                    'severity': issue.severity.value if hasattr(issue.severity, 'value') else str(issue.severity),
-                    'message': issue.message,
-                    'line_number': issue.line_number,
-                    'recommendation': issue.recommendation
-                }
-                for issue in security_issues
-            ]
-            
-            # Store chunks with repository context
-            for chunk in chunks:
-                chunk.repository = repository_name
-                chunk.security_issues = security_issues
-            
-            result['chunks_created'] = len(chunks)
-            result['security_issues_found'] = len(security_issues)
-            
-        except Exception as e:
-            result['error'] = str(e)
-            self.logger.error(f"Error processing file {file_path}: {e}")
-        finally:
-            result['processing_time'] = time.time() - start_time
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._is_excluded(entry.name):
+                                pending_dirs.append(entry.path)
+                        elif entry.is_file():
+                            file_path = Path(entry.path)
+                            if self._should_process_file(file_path, entry):
+                                # DirEntry caches its stat, so this is no extra syscall
+                                files.append((file_path, entry.stat().st_size))
+            except (OSError, IOError) as e:
+                self.logger.error(f"Error collecting files from {directory}: {e}")
         
-        return result
+        return sorted(files)
     
-    def _detect_language(self, file_path: Path) -> str:
+    @staticmethod
+    def _detect_language(file_path: Path) -> str:
         """Detect programming language from file extension."""
-        extension = file_path.suffix.lower()
-        name = file_path.name.lower()
-        
-        # Map extensions to languages
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.tsx': 'typescript',
-            '.jsx': 'javascript',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.h': 'c',
-            '.hpp': 'cpp',
-            '.cs': 'csharp',
-            '.php': 'php',
-            '.rb': 'ruby',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.scala': 'scala',
-            '.r': 'r',
-            '.sql': 'sql',
-            '.sh': 'bash',
-            '.bash': 'bash',
-            '.zsh': 'bash',
-            '.fish': 'bash',
-            '.ps1': 'powershell',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.json': 'json',
-            '.xml': 'xml',
-            '.html': 'html',
-            '.css': 'css',
-            '.scss': 'css',
-            '.less': 'css',
-            '.md': 'markdown',
-            '.rst': 'rst',
-            '.txt': 'text'
-        }
-        
-        # Special files without extensions
-        name_map = {
-            'dockerfile': 'dockerfile',
-            'makefile': 'makefile',
-            'rakefile': 'ruby',
-            'gemfile': 'ruby'
-        }
-        
-        return name_map.get(name, extension_map.get(extension, 'unknown'))
+        return _NAME_MAP.get(file_path.name.lower()) or _EXTENSION_MAP.get(file_path.suffix.lower(), 'unknown')
     
-    async def _store_chunks_batch(self, chunks: List[CodeChunk]) -> Tuple[int, int, int]:
-        """Store chunks in batches and return (stored, duplicates, errors)."""
+    async def _store_chunks_batch(self, chunks: List[CodeChunk],
+                                  seen_hashes: Optional[Set[str]] = None) -> Tuple[int, int, int]:
+        """Store chunks in batches and return (stored, duplicates, errors).
+        
+        Chunks whose content hash is already in seen_hashes are counted as
+        duplicates without being sent to storage; new hashes are added to it.
+        """
         stored_count = 0
         duplicate_count = 0
         error_count = 0
         
-        # Process chunks in smaller batches to avoid memory issues
+        if seen_hashes is not None:
+            # The hash is the storage ID, so a repeat within the run is always a duplicate
+            unique_chunks = []
+            for chunk in chunks:
+                if chunk.sha256 in seen_hashes:
+                    duplicate_count += 1
+                else:
+                    seen_hashes.add(chunk.sha256)
+                    unique_chunks.append(chunk)
+            chunks = unique_chunks
+        
+        # One store_many call per batch so embeddings are computed together
         for i in range(0, len(chunks), self.chunk_size):
             batch = chunks[i:i + self.chunk_size]
-            for chunk in batch:
-                try:
-                    memory = chunk.to_memory()
-                    success, message = await self.storage.store(memory)
-                    if success:
-                        stored_count += 1
-                    elif "Duplicate content detected" in message:
-                        duplicate_count += 1
-                    else:
-                        error_count += 1
-                except Exception as e:
-                    self.logger.error(f"Error storing chunk: {e}")
+            try:
+                outcomes = await self.storage.store_many([chunk.to_memory() for chunk in batch])
+            except Exception as e:
+                self.logger.error(f"Error storing chunk batch: {e}")
+                error_count += len(batch)
+                continue
+            for success, message in outcomes:
+                if success:
+                    stored_count += 1
+                elif "Duplicate content detected" in message:
+                    duplicate_count += 1
+                else:
                     error_count += 1
         
         return stored_count, duplicate_count, error_count
     
     async def process_repository(self, repository_path: str, repository_name: str,
                                progress_callback: Optional[Callable] = None,
-                               store_results: bool = True) -> BatchResult:
-        """Process an entire repository with batch processing capabilities."""
+                               store_results: bool = True,
+                               results_path: Optional[str] = None) -> BatchResult:
+        """Process an entire repository with batch processing capabilities.
+        
+        If results_path is given, per-file results are written there as NDJSON
+        as files complete instead of being kept in BatchResult.file_results,
+        so memory stays flat however large the repository is.
+        """
         repo_path = Path(repository_path)
         if not repo_path.exists():
             raise ValueError(f"Repository path does not exist: {repository_path}")
         
         # Initialize result tracking
         progress = BatchProgress()
-        result = BatchResult(repository_name=repository_name, repository_path=repository_path, progress=progress)
+        result = BatchResult(repository_name=repository_name, repository_path=repository_path, progress=progress,
+                             file_results_path=results_path)
         
         # Collect files to process
         files_to_process = self._collect_files(repo_path)
@@ -332,104 +497,126 @@ class BatchProcessor:
         
         if progress.total_files == 0:
             self.logger.warning(f"No files found to process in {repository_path}")
+            if results_path:
+                # Leave an empty results file, so file_results_path always names a readable file
+                open(results_path, 'w', encoding='utf-8').close()
             return result
         
         self.logger.info(f"Starting batch processing of {progress.total_files} files in {repository_name}")
         
-        # Process files in parallel batches
-        all_chunks = []
-        
-        def update_progress(**kwargs):
-            for key, value in kwargs.items():
-                setattr(progress, key, value)
-            if progress_callback:
+        # Process files in parallel; completed files are stored in chunk_size
+        # batches while the remaining files are still being analyzed
+        pending_chunks: List[CodeChunk] = []
+        seen_hashes: Set[str] = set()
+        stored_total = duplicate_total = error_total = 0
+        
+        last_progress_emit = 0.0
+        
+        def update_progress(force: bool = False):
+            # Publish at most every _PROGRESS_INTERVAL seconds, not once per file
+            nonlocal last_progress_emit
+            if not progress_callback:
+                return
+            now = time.monotonic()
+            if force or now - last_progress_emit >= _PROGRESS_INTERVAL:
+                last_progress_emit = now
                 progress_callback(progress)
         
-        # Use ThreadPoolExecutor for CPU-bound file processing
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all file processing tasks
-            future_to_file = {
-                executor.submit(self._process_single_file, file_path, repository_name, update_progress): file_path
-                for file_path in files_to_process
-            }
-            
-            # Process completed tasks
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    file_result = future.result()
-                    progress.processed_files += 1
-                    
-                    # Store file result
-                    result.file_results[str(file_path)] = file_result
-                    
-                    # Aggregate statistics
-                    if file_result.get('error'):
-                        progress.failed_files += 1
-                        result.error_summary[file_result['error']].append(str(file_path))
-                    else:
-                        # Count chunks and security issues
-                        chunks_count = file_result.get('chunks_created', 0)
-                        progress.total_chunks += chunks_count
-                        
-                        security_count = file_result.get('security_issues_found', 0)
-                        progress.security_issues += security_count
-                        
-                        # Language statistics
-                        language = file_result.get('language', 'unknown')
-                        result.language_summary[language] += 1
+        async def flush_chunks() -> None:
+            nonlocal pending_chunks, stored_total, duplicate_total, error_total
+            batch, pending_chunks = pending_chunks, []
+            stored, duplicates, errors = await self._store_chunks_batch(batch, seen_hashes)
+            stored_total += stored
+            duplicate_total += duplicates
+            error_total += errors
+            progress.stored_chunks = stored_total
+        
+        async def process_group(group: List[Tuple[Path, int]]) -> List[Tuple[Path, Dict]]:
+            try:
+                return await loop.run_in_executor(executor, _process_files, group, repository_name)
+            except Exception as e:
+                # A worker that dies (e.g. BrokenProcessPool) fails its whole group
+                self.logger.error(f"Error processing {len(group)} files: {e}")
+                error_msg = f"Processing failed: {str(e)}"
+                return [(file_path, {'file_path': str(file_path), 'error': error_msg}) for file_path, _ in group]
+        
+        loop = asyncio.get_running_loop()
+        # Chunking and security analysis are pure-Python CPU work, so they run in
+        # worker processes to get past the GIL. Files are submitted in groups to
+        # amortize pickling and IPC; a single worker just uses a thread.
+        group_size = max(1, len(files_to_process) // (self.max_workers * 4))
+        groups = [files_to_process[i:i + group_size] for i in range(0, len(files_to_process), group_size)]
+        executor: Executor
+        if self.max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+        else:
+            executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker)
+        
+        results_file = open(results_path, 'w', encoding='utf-8') if results_path else None
+        
+        with executor, results_file or contextlib.nullcontext():
+            for next_done in asyncio.as_completed([process_group(group) for group in groups]):
+                for file_path, file_result in await next_done:
+                    try:
+                        progress.processed_files += 1
+                        progress.current_file = str(file_path)
+                        chunk_objects = file_result.pop('_chunk_objects', [])
                         
-                        # Security severity statistics
-                        for issue in file_result.get('security_issues', []):
-                            severity = issue.get('severity', 'unknown')
-                            result.security_summary[severity] += 1
+                        # Store file result
+                        if results_file:
+                            results_file.write(
+                                json.dumps(_serializable_file_result(file_result), ensure_ascii=False) + '\n'
+                            )
+                        else:
+                            result.file_results[str(file_path)] = file_result
                         
-                        # Prepare chunks for storage if enabled
-                        if store_results and chunks_count > 0:
-                            try:
-                                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                                language = self._detect_language(file_path)
-                                chunker = self.chunker_factory.get_chunker(language)
-                                if chunker:
-                                    chunks = chunker.chunk_content(content, str(file_path))
-                                    for chunk in chunks:
-                                        chunk.repository = repository_name
-                                        # Add security issues if any
-                                        security_issues = [
-                                            SecurityIssue(
-                                                issue_type=issue['type'],
-                                                severity=getattr(Severity, issue['severity'].upper(), Severity.LOW),
-                                                message=issue['message'],
-                                                line_number=issue['line_number'],
-                                                recommendation=issue['recommendation']
-                                            )
-                                            for issue in file_result.get('security_issues', [])
-                                        ]
-                                        chunk.security_issues = security_issues
-                                    all_chunks.extend(chunks)
-                            except Exception as e:
-                                self.logger.error(f"Error preparing chunks for storage: {e}")
-                
-                except Exception as e:
-                    progress.failed_files += 1
-                    progress.processed_files += 1
-                    error_msg = f"Processing failed: {str(e)}"
-                    result.error_summary[error_msg].append(str(file_path))
-                    self.logger.error(f"Error processing {file_path}: {e}")
-                
-                # Update progress
-                update_progress()
-        
-        # Store chunks if enabled
-        if store_results and all_chunks:
-            self.logger.info(f"Storing {len(all_chunks)} chunks to vector database...")
-            stored, duplicates, errors = await self._store_chunks_batch(all_chunks)
-            progress.stored_chunks = stored
-            
-            self.logger.info(f"Storage complete: {stored} stored, {duplicates} duplicates, {errors} errors")
+                        # Aggregate statistics
+                        if file_result.get('error'):
+                            progress.failed_files += 1
+                            result.error_summary[file_result['error']].append(str(file_path))
+                        else:
+                            # Count chunks and security issues
+                            chunks_count = file_result.get('chunks_created', 0)
+                            progress.total_chunks += chunks_count
+                            
+                            security_count = file_result.get('security_issues_found', 0)
+                            progress.security_issues += security_count
+                            
+                            # Language statistics
+                            language = file_result.get('language', 'unknown')
+                            result.language_summary[language] += 1
+                            
+                            # Security severity statistics
+                            for issue in file_result.get('security_issues', []):
+                                severity = issue.get('severity', 'unknown')
+                                result.security_summary[severity] += 1
+                            
+                            # Queue the already-chunked file for storage if enabled
+                            if store_results and chunk_objects:
+                                pending_chunks.extend(chunk_objects)
+                                if len(pending_chunks) >= self.chunk_size:
+                                    await flush_chunks()
+                    
+                    except Exception as e:
+                        progress.failed_files += 1
+                        error_msg = f"Processing failed: {str(e)}"
+                        result.error_summary[error_msg].append(str(file_path))
+                        self.logger.error(f"Error processing {file_path}: {e}")
+                    
+                    # Update progress
+                    update_progress()
+        
+        # Store any remaining chunks
+        if store_results and pending_chunks:
+            await flush_chunks()
+        
+        if store_results:
+            self.logger.info(
+                f"Storage complete: {stored_total} stored, {duplicate_total} duplicates, {error_total} errors"
+            )
         
         # Final progress update
-        update_progress()
+        update_progress(force=True)
         
         processing_time = progress.elapsed_time
         self.logger.info(
@@ -3,7 +3,6 @@ Base classes for code chunking functionality.
 """
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
-import hashlib
 from pathlib import Path
 
 from ...models.code import CodeChunk
@@ -37,9 +36,9 @@ class ChunkerBase(ABC):
 class GenericChunker(ChunkerBase):
     """Fallback chunker for unsupported languages."""
     
-    def __init__(self):
+    def __init__(self, language_name: str = "text"):
         super().__init__()
-        self.language_name = "text"
+        self.language_name = language_name
         self.supported_extensions = set()  # Supports any file as fallback
     
     def chunk_content(self, content: str, file_path: str, 
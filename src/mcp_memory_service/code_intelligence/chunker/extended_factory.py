@@ -2,7 +2,6 @@
 Extended factory with support for more file types.
 """
 from .factory import ChunkerFactory
-from .base import GenericChunker
 
 
 def initialize_extended_file_support():
@@ -55,23 +54,11 @@ def initialize_extended_file_support():
         '.dockerfile': 'dockerfile',
     }
     
-    # Register each extension
-    for ext, lang in additional_extensions.items():
-        # Create a language-specific chunker dynamically
-        chunker_class = type(
-            f"{lang.capitalize().replace('_', '')}Chunker",
-            (GenericChunker,),
-            {
-                '__init__': lambda self, lang=lang: (
-                    super(type(self), self).__init__(),
-                    setattr(self, 'language_name', lang)
-                )
-            }
-        )
-        
-        # Register with factory
-        extensions = [ext] if ext.startswith('.') else []
-        ChunkerFactory.register_chunker(lang, chunker_class, extensions=extensions)
+    # Register every extension in one pass; these languages all share GenericChunker
+    ChunkerFactory.register_languages(
+        (lang, [ext] if ext.startswith('.') else [])
+        for ext, lang in additional_extensions.items()
+    )
 
 
 # Don't initialize on import to avoid circular dependencies
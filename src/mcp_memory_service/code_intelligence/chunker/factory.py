@@ -1,7 +1,8 @@
 """
 Factory for creating appropriate code chunkers.
 """
-from typing import List, Optional, Dict, Type
+import functools
+from typing import Iterable, List, Optional, Dict, Set, Tuple, Type
 from pathlib import Path
 
 from .base import ChunkerBase, GenericChunker
@@ -23,6 +24,9 @@ class ChunkerFactory:
         'rust': RustChunker,
     }
     
+    # Languages chunked by a GenericChunker tagged with the language name
+    _generic_languages: Set[str] = set()
+    
     # Extension to language mapping
     _extension_map: Dict[str, str] = {
         '.py': 'python',
@@ -41,13 +45,29 @@ class ChunkerFactory:
         """Get appropriate chunker for a file."""
         if language:
             # Use specified language
-            chunker_class = cls._chunkers.get(language, GenericChunker)
-        else:
-            # Auto-detect from extension
-            ext = Path(file_path).suffix.lower()
-            detected_language = cls._extension_map.get(ext)
-            chunker_class = cls._chunkers.get(detected_language, GenericChunker)
+            return cls._get_language_instance(language)
         
+        # Auto-detect from extension
+        return cls.get_chunker_for_extension(Path(file_path).suffix.lower())
+    
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def get_chunker_for_extension(cls, ext: str) -> ChunkerBase:
+        """Get the shared chunker instance for a file extension."""
+        return cls._get_language_instance(cls._extension_map.get(ext.lower()))
+    
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_language_instance(cls, language: Optional[str]) -> ChunkerBase:
+        """Return the shared chunker instance for a language."""
+        if language in cls._generic_languages:
+            return GenericChunker(language)
+        return cls._get_chunker_instance(cls._chunkers.get(language, GenericChunker))
+    
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _get_chunker_instance(cls, chunker_class: Type[ChunkerBase]) -> ChunkerBase:
+        """Return one shared instance per chunker class; chunkers hold no per-file state."""
         return chunker_class()
     
     @classmethod
@@ -65,21 +85,57 @@ class ChunkerFactory:
         return chunker.chunk_content(content, file_path, repository)
     
     @classmethod
-    def get_supported_extensions(cls) -> List[str]:
-        """Get list of all supported file extensions."""
-        return list(cls._extension_map.keys())
+    @functools.lru_cache(maxsize=None)
+    def get_supported_extensions(cls) -> Tuple[str, ...]:
+        """Get all supported file extensions."""
+        return tuple(cls._extension_map.keys())
     
     @classmethod
     def get_supported_languages(cls) -> List[str]:
         """Get list of all supported languages."""
-        return list(cls._chunkers.keys())
+        return list(cls._chunkers.keys()) + sorted(cls._generic_languages)
     
     @classmethod
     def register_chunker(cls, language: str, chunker_class: Type[ChunkerBase],
                         extensions: List[str] = None):
         """Register a new chunker for a language."""
         cls._chunkers[language] = chunker_class
-        
+        cls._generic_languages.discard(language)
+        cls._map_extensions(language, extensions)
+        cls.reset_cache()
+    
+    @classmethod
+    def register_language(cls, language: str, extensions: List[str] = None):
+        """Register a language that is chunked by a GenericChunker tagged with its name."""
+        cls.register_languages([(language, extensions)])
+    
+    @classmethod
+    def register_languages(cls, languages: Iterable[Tuple[str, Optional[List[str]]]]):
+        """Register many (language, extensions) pairs, dropping memoized lookups once."""
+        for language, extensions in languages:
+            if language not in cls._chunkers:
+                cls._generic_languages.add(language)
+            cls._map_extensions(language, extensions)
+        cls.reset_cache()
+    
+    @classmethod
+    def _map_extensions(cls, language: str, extensions: Optional[List[str]]):
+        """Map extensions to language."""
         if extensions:
             for ext in extensions:
-                cls._extension_map[ext] = language
\ No newline at end of file
+                cls._extension_map[ext] = language
+    
+    @classmethod
+    def reset_cache(cls):
+        """Drop the shared chunker instances and memoized lookups.
+        
+        Registrations call this because they change the lookup tables; tests
+        can call it to start from fresh chunker instances.
+        """
+        cls.get_supported_extensions.cache_clear()
+        cls.get_chunker_for_extension.cache_clear()
+        cls._get_language_instance.cache_clear()
+        cls._get_chunker_instance.cache_clear()
+
+# Shared factory; all lookups are class-level and memoized
+CHUNKER_FACTORY = ChunkerFactory()
@@ -10,7 +10,7 @@ from dataclasses import dataclass, field
 import logging
 from concurrent.futures import ThreadPoolExecutor
 
-from ..chunker.factory import ChunkerFactory
+from ..chunker.factory import CHUNKER_FACTORY
 from ..chunker.extended_factory import initialize_extended_file_support
 from ...models.memory import Memory
 from ...utils.hashing import generate_content_hash
@@ -234,13 +234,12 @@ class AsyncRepositorySync:
             )
             
             # Detect language
-            factory = ChunkerFactory()
             language = self._detect_language(file_path)
             
             # Get appropriate chunker
-            chunker = factory.get_chunker(language)
+            chunker = CHUNKER_FACTORY.get_chunker(language)
             if not chunker:
-                chunker = factory.get_chunker('generic')
+                chunker = CHUNKER_FACTORY.get_chunker('generic')
             
             # Chunk the content
             chunks = await loop.run_in_executor(
@@ -314,8 +313,7 @@ class AsyncRepositorySync:
     def _scan_repository_sync(self, repo_path: Path) -> Dict[str, FileMetadata]:
         """Synchronous repository scanning."""
         files = {}
-        factory = ChunkerFactory()
-        supported_extensions = factory.get_supported_extensions()
+        supported_extensions = CHUNKER_FACTORY.get_supported_extensions()
         
         # Excluded directories
         excluded_dirs = {
@@ -2,8 +2,11 @@
 Automatic repository discovery and detection system.
 """
 import os
+import re
 import json
 import asyncio
+import fnmatch
+import functools
 from pathlib import Path
 from typing import List, Dict, Set, Optional, Tuple
 from dataclasses import dataclass
@@ -12,6 +15,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=32)
+def _compile_excludes(patterns: Tuple[str, ...]) -> re.Pattern:
+    """Compile exclude patterns into one regex searched against a path.
+    
+    Plain names match anywhere in the path, as before; patterns containing
+    glob characters are translated with fnmatch.
+    """
+    if not patterns:
+        return re.compile(r'(?!)')  # never matches
+    parts = [
+        fnmatch.translate(pattern) if any(c in pattern for c in '*?[') else re.escape(pattern)
+        for pattern in patterns
+    ]
+    return re.compile('|'.join(parts))
+
 @dataclass
 class RepositoryInfo:
     """Information about a discovered repository."""
@@ -79,6 +97,7 @@ class RepositoryDiscovery:
             'node_modules', '.git', '__pycache__', 'venv', 'env',
             'build', 'dist', 'target', '.pytest_cache', '.tox'
         ]
+        self._exclude_re = _compile_excludes(tuple(self.exclude_patterns))
         self.max_depth = max_depth
         self.min_files = min_files
         self._discovered_repos: Dict[str, RepositoryInfo] = {}
@@ -116,7 +135,7 @@ class RepositoryDiscovery:
             return
         
         # Check if this path should be excluded
-        if any(pattern in str(path) for pattern in self.exclude_patterns):
+        if self._exclude_re.search(str(path)):
             return
         
         try:
@@ -181,10 +200,7 @@ class RepositoryDiscovery:
             for pattern in patterns:
                 files = list(path.rglob(pattern))
                 # Exclude files in excluded directories
-                files = [
-                    f for f in files
-                    if not any(exc in str(f) for exc in self.exclude_patterns)
-                ]
+                files = [f for f in files if not self._exclude_re.search(str(f))]
                 count += len(files)
                 code_files.extend(files[:100])  # Limit for performance
             
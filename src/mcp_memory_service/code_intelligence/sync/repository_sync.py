@@ -14,7 +14,7 @@ from pathlib import Path
 from typing import List, Dict, Set, Optional, Tuple, Any
 from datetime import datetime
 
-from ..chunker.factory import ChunkerFactory
+from ..chunker.factory import CHUNKER_FACTORY
 from ...models.code import CodeChunk
 from .file_watcher import FileWatcher, FileChangeEvent, ChangeType
 
@@ -165,8 +165,7 @@ class RepositorySync:
     async def _scan_repository(self, repo_path: Path) -> Dict[str, FileMetadata]:
         """Scan repository and create file metadata."""
         files = {}
-        factory = ChunkerFactory()
-        supported_extensions = factory.get_supported_extensions()
+        supported_extensions = CHUNKER_FACTORY.get_supported_extensions()
         
         for file_path in repo_path.rglob('*'):
             if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
@@ -277,8 +276,7 @@ class RepositorySync:
     async def _process_file(self, repository_name: str, file_path: str, metadata: FileMetadata) -> int:
         """Process a single file and store its chunks."""
         # Get the chunker for this file
-        factory = ChunkerFactory()
-        chunker = factory.get_chunker(file_path)
+        chunker = CHUNKER_FACTORY.get_chunker(file_path)
         
         # Read file content
         full_path = Path(self.repositories.get(repository_name, {}).get('path', '')) / file_path
@@ -3,16 +3,18 @@ Enhanced MCP Memory Server with Code Intelligence.
 Maintains backward compatibility while adding new features.
 """
 import asyncio
+import contextlib
 import logging
 import os
+import tempfile
 import time
 from datetime import datetime
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Tuple
 from mcp import types
 
 from .server import MemoryServer
-from .models.code import CodeChunk
-from .code_intelligence.chunker.factory import ChunkerFactory
+from .models.code import CodeChunk, IngestStats
+from .code_intelligence.chunker.factory import CHUNKER_FACTORY
 from .code_intelligence.sync.repository_sync import RepositorySync
 from .code_intelligence.sync.async_repository_sync import AsyncRepositorySync
 from .code_intelligence.sync.auto_sync_manager import AutoSyncManager
@@ -139,6 +141,18 @@ class EnhancedMemoryServer(MemoryServer):
                 self._auto_sync_lock.release()
             except:
                 pass  # Ignore errors during cleanup
+        try:
+            self.remove_batch_result_files()
+        except Exception:
+            pass  # Module globals may already be gone at interpreter exit
+    
+    def remove_batch_result_files(self) -> None:
+        """Delete the per-file results files of stored batch analyses and forget those analyses."""
+        for result in getattr(self, '_batch_results', {}).values():
+            if result.file_results_path:
+                with contextlib.suppress(OSError):
+                    os.remove(result.file_results_path)
+        self._batch_results = {}
     
     def get_parent_tools(self) -> List[types.Tool]:
         """Get the list of tools from parent class."""
@@ -813,12 +827,113 @@ class EnhancedMemoryServer(MemoryServer):
     
     async def _handle_ingest_code_file(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Handle code file ingestion."""
-        file_path = arguments.get("file_path")
-        language = arguments.get("language")
-        repository = arguments.get("repository")
+        result, _ = await self._ingest_code_file(arguments)
+        return result
+    
+    async def _ingest_code_file(self, arguments: Dict[str, Any]) -> Tuple[List[types.TextContent], IngestStats]:
+        """Ingest a code file, returning the rendered result alongside structured stats."""
+        return await self._ingest_code(
+            arguments.get("file_path"),
+            repository=arguments.get("repository"),
+            language=arguments.get("language")
+        )
+    
+    async def _ingest_code_file_fast(self, file_path: str, repository: str = None,
+                                     contents: bytes = None) -> IngestStats:
+        """Bulk-ingest path for trusted in-process callers: no argument dict, no rendered text.
+        
+        If contents is given it is used instead of reading file_path again.
+        """
+        _, stats = await self._ingest_code(file_path, repository, contents=contents, render=False)
+        return stats
+    
+    @staticmethod
+    def _read_and_chunk(file_path: str, repository: str = None,
+                        contents: bytes = None) -> List[CodeChunk]:
+        """Read a file, unless its contents are given, and chunk it; safe to call from worker threads."""
+        if contents is not None:
+            content = contents.decode('utf-8')
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        return CHUNKER_FACTORY.get_chunker(file_path).chunk_content(
+            content, file_path, repository or "unknown"
+        )
+    
+    async def _ingest_code_files_fast(self, file_paths: List[str],
+                                      repository: str = None) -> List[IngestStats]:
+        """Bulk-ingest several files with a single store_many call; returns stats per file."""
+        start_time = time.time()
+        all_stats = [IngestStats() for _ in file_paths]
+        memories = []
+        owners = []  # index into file_paths for each memory
+        
+        def _chunk_all() -> List[Any]:
+            """Read and chunk every file, returning its chunks or the exception it raised."""
+            chunked = []
+            for file_path in file_paths:
+                try:
+                    chunked.append(self._read_and_chunk(file_path, repository))
+                except Exception as e:
+                    chunked.append(e)
+            return chunked
+        
+        # Reading and chunking are blocking, so they run off the event loop and
+        # overlap with other batches being stored
+        chunked = await asyncio.to_thread(_chunk_all)
+        
+        for index, (file_path, chunks) in enumerate(zip(file_paths, chunked)):
+            stats = all_stats[index]
+            if isinstance(chunks, Exception):
+                logger.error(f"Error ingesting code file {file_path}: {chunks}")
+                stats.errors.append(str(chunks))
+                continue
+            
+            stats.chunks_total = len(chunks)
+            memories.extend(chunk.to_memory() for chunk in chunks)
+            owners.extend([index] * len(chunks))
+        
+        error_msg = None
+        try:
+            if memories:
+                # One embedding pass and one write for every chunk in the batch
+                for index, (success, message) in zip(owners, await self.storage.store_many(memories)):
+                    if success or "Duplicate content detected" in message:
+                        all_stats[index].chunks_ok += 1
+                    else:
+                        all_stats[index].errors.append(message)
+                
+                if any(stats.chunks_ok for stats in all_stats):
+                    await self.storage.register_repository(repository or "unknown")
+                cache_manager.invalidate_repository(repository or "unknown")
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error storing code chunks: {error_msg}")
+            for index in set(owners):
+                all_stats[index].errors.append(error_msg)
+        finally:
+            if self.metrics_collector:
+                self.metrics_collector.record_usage(
+                    command="ingest_code_file",
+                    duration=time.time() - start_time,
+                    repository=repository,
+                    files_processed=len(file_paths),
+                    chunks_created=len(memories),
+                    success=error_msg is None,
+                    error=error_msg
+                )
+        
+        return all_stats
+    
+    async def _ingest_code(self, file_path: str, repository: str = None, language: str = None,
+                           contents: bytes = None,
+                           render: bool = True) -> Tuple[List[types.TextContent], IngestStats]:
+        """Chunk and store one file; the result text is only built when render is set."""
+        stats = IngestStats()
         
         if not file_path:
-            return [types.TextContent(type="text", text="Error: file_path is required")]
+            stats.errors.append("file_path is required")
+            return [types.TextContent(type="text", text="Error: file_path is required")], stats
         
         # Track performance metrics
         start_time = time.time()
@@ -828,36 +943,39 @@ class EnhancedMemoryServer(MemoryServer):
         
         try:
             # Chunk the file
-            factory = ChunkerFactory()
-            chunker = factory.get_chunker(file_path)
-            
-            # Read file content
-            import os
-            if not os.path.exists(file_path):
-                return [types.TextContent(type="text", text=f"Error: File not found: {file_path}")]
+            chunker = CHUNKER_FACTORY.get_chunker(file_path)
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if contents is not None:
+                content = contents.decode('utf-8')
+            else:
+                # Read file content; a missing file surfaces from open() itself
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except FileNotFoundError:
+                    stats.errors.append(f"File not found: {file_path}")
+                    return [types.TextContent(type="text", text=f"Error: File not found: {file_path}")], stats
             
             chunks = chunker.chunk_content(content, file_path, repository or "unknown")
             
             if not chunks:
-                return [types.TextContent(type="text", text=f"No code chunks found in {file_path}")]
+                return [types.TextContent(type="text", text=f"No code chunks found in {file_path}")], stats
             
             # Store chunks using existing memory infrastructure
-            stored_count = 0
-            duplicate_count = 0
-            error_count = 0
-            
-            for chunk in chunks:
-                memory = chunk.to_memory()
-                success, message = await self.storage.store(memory)
-                if success:
-                    stored_count += 1
-                elif "Duplicate content detected" in message:
-                    duplicate_count += 1
-                else:
-                    error_count += 1
+            stored_count, duplicate_count, error_count = await self._store_code_chunks(
+                chunks, repository
+            )
+            stats.chunks_total = len(chunks)
+            stats.chunks_ok = stored_count + duplicate_count
+            if error_count:
+                stats.errors.append(f"{error_count} chunks failed to store")
+            
+            # Record successful metrics
+            success = True
+            chunks_created = len(chunks)
+            
+            if not render:
+                return [], stats
             
             # Create meaningful status message
             status_parts = []
@@ -883,18 +1001,12 @@ class EnhancedMemoryServer(MemoryServer):
             if len(chunks) > 5:
                 result.append(f"  ... and {len(chunks) - 5} more")
             
-            # Invalidate caches for this repository since we added new code
-            cache_manager.invalidate_repository(repository or "unknown")
-            
-            # Record successful metrics
-            success = True
-            chunks_created = len(chunks)
-            
-            return [types.TextContent(type="text", text="\n".join(result))]
+            return [types.TextContent(type="text", text="\n".join(result))], stats
             
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Error ingesting code file: {error_msg}")
+            stats.errors.append(error_msg)
             
             # Record error in metrics
             if self.metrics_collector:
@@ -902,7 +1014,7 @@ class EnhancedMemoryServer(MemoryServer):
                                                    file_path=file_path, 
                                                    repository=repository)
             
-            return [types.TextContent(type="text", text=f"Error ingesting file: {error_msg}")]
+            return [types.TextContent(type="text", text=f"Error ingesting file: {error_msg}")], stats
         finally:
             # Record usage metrics
             if self.metrics_collector:
@@ -918,6 +1030,37 @@ class EnhancedMemoryServer(MemoryServer):
                     error=error_msg
                 )
     
+    async def _store_code_chunks(self, chunks: List[CodeChunk], 
+                                 repository: str = None) -> Tuple[int, int, int]:
+        """Store already-chunked code and return (stored, duplicates, errors)."""
+        stored_count = 0
+        duplicate_count = 0
+        error_count = 0
+        
+        for success, message in await self._store_code_chunk_results(chunks, repository):
+            if success:
+                stored_count += 1
+            elif "Duplicate content detected" in message:
+                duplicate_count += 1
+            else:
+                error_count += 1
+        
+        return stored_count, duplicate_count, error_count
+    
+    async def _store_code_chunk_results(self, chunks: List[CodeChunk],
+                                        repository: str = None) -> List[Tuple[bool, str]]:
+        """Store already-chunked code and return the (success, message) result of each chunk."""
+        memories = [chunk.to_memory() for chunk in chunks]
+        results = await self.storage.store_many(memories)
+        
+        if any(success or "Duplicate content detected" in message for success, message in results):
+            await self.storage.register_repository(repository or "unknown")
+        
+        # Invalidate caches for this repository since we added new code
+        cache_manager.invalidate_repository(repository or "unknown")
+        
+        return results
+    
     async def _handle_search_code(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Handle code search requests with caching."""
         query = arguments.get("query")
@@ -940,6 +1083,7 @@ class EnhancedMemoryServer(MemoryServer):
             else:
                 # Use the basic query for semantic search
                 search_query = query
+                search_start = time.perf_counter()
                 
                 # Use existing retrieve method
                 results = await self.storage.retrieve(search_query, n_results * 2)  # Get more to filter
@@ -974,9 +1118,10 @@ class EnhancedMemoryServer(MemoryServer):
                         if len(code_results) >= n_results:
                             break
                 
-                # Cache the results for future use
+                # Cache the results for future use, weighted by what they cost to compute
                 cache_manager.search_cache.cache_search_results(
-                    query, code_results, repository, language, n_results
+                    query, code_results, repository, language, n_results,
+                    cost_ms=(time.perf_counter() - search_start) * 1000
                 )
             
             if not code_results:
@@ -1336,6 +1481,8 @@ class EnhancedMemoryServer(MemoryServer):
                 if len(result.errors) > 5:
                     result_lines.append(f"  ... and {len(result.errors) - 5} more errors")
             
+            await self.storage.register_repository(repository_name, time.time())
+            
             # Invalidate caches for this repository
             cache_manager.invalidate_repository(repository_name)
             
@@ -1347,18 +1494,27 @@ class EnhancedMemoryServer(MemoryServer):
     
     async def _handle_list_repositories(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Handle repository listing requests."""
-        if not self.repository_sync:
-            return [types.TextContent(type="text", text="Error: Repository synchronization not enabled")]
-        
         try:
-            repositories = self.repository_sync.list_repositories()
-            
-            if not repositories:
-                return [types.TextContent(type="text", text="No repositories are currently synchronized")]
-            
-            result_lines = ["Synchronized Repositories:", ""]
-            
-            for repo in repositories:
+            # The repository index is authoritative for names; sync adds details when it tracks a repo
+            repository_names = await self.storage.list_repositories()
+            sync_details = {}
+            if self.repository_sync and hasattr(self.repository_sync, 'list_repositories'):
+                sync_details = {repo['name']: repo for repo in self.repository_sync.list_repositories()}
+            
+            # Index names arrive distinct and sorted; only re-sort when sync knows extra repos
+            known = dict.fromkeys(repository_names)
+            extra = [name for name in sync_details if name not in known]
+            names = sorted(repository_names + extra) if extra else repository_names
+            if not names:
+                return [types.TextContent(type="text", text="No repositories found")]
+            
+            result_lines = ["Repositories:", ""]
+            
+            for name in names:
+                repo = sync_details.get(name)
+                if repo is None:
+                    result_lines.extend([f"📁 {name}", ""])
+                    continue
                 result_lines.extend([
                     f"📁 {repo['name']}",
                     f"   Path: {repo['path']}",
@@ -1455,6 +1611,7 @@ class EnhancedMemoryServer(MemoryServer):
         if not self.batch_processor:
             return [types.TextContent(type="text", text="Error: Batch processing not enabled")]
         
+        results_path = None
         try:
             # Configure batch processor
             self.batch_processor.max_workers = max_workers
@@ -1472,6 +1629,10 @@ class EnhancedMemoryServer(MemoryServer):
                     'current_file': progress.current_file
                 })
             
+            # Per-file results are streamed to a sidecar file rather than held in memory
+            results_fd, results_path = tempfile.mkstemp(prefix="batch_analysis_", suffix=".ndjson")
+            os.close(results_fd)
+            
             # Start batch processing
             logger.info(f"Starting batch analysis of repository: {repository_name}")
             
@@ -1486,19 +1647,25 @@ class EnhancedMemoryServer(MemoryServer):
                         repository_path=repository_path,
                         repository_name=repository_name,
                         progress_callback=progress_callback,
-                        store_results=store_results
+                        store_results=store_results,
+                        results_path=results_path
                     )
             else:
                 result = await self.batch_processor.process_repository(
                     repository_path=repository_path,
                     repository_name=repository_name,
                     progress_callback=progress_callback,
-                    store_results=store_results
+                    store_results=store_results,
+                    results_path=results_path
                 )
             
             # Store result for later report generation if needed
             if not hasattr(self, '_batch_results'):
                 self._batch_results = {}
+            previous = self._batch_results.get(repository_name)
+            if previous is not None and previous.file_results_path:
+                with contextlib.suppress(OSError):
+                    os.remove(previous.file_results_path)
             self._batch_results[repository_name] = result
             
             # Generate summary
@@ -1557,7 +1724,7 @@ class EnhancedMemoryServer(MemoryServer):
                 )
                 
                 # Record security findings
-                for file_path, file_result in result.file_results.items():
+                for file_path, file_result in result.iter_file_results():
                     for issue in file_result.get('security_issues', []):
                         self.metrics_collector.record_security_finding(
                             repository=repository_name,
@@ -1573,6 +1740,12 @@ class EnhancedMemoryServer(MemoryServer):
         except Exception as e:
             logger.error(f"Error during batch analysis: {str(e)}")
             
+            # Drop the results file unless a stored result still refers to it
+            stored = getattr(self, '_batch_results', {}).get(repository_name)
+            if results_path and (stored is None or stored.file_results_path != results_path):
+                with contextlib.suppress(OSError):
+                    os.remove(results_path)
+            
             # Record error metrics
             if self.metrics_collector:
                 self.metrics_collector.record_error("batch_analyze_repository", e, 
@@ -2049,6 +2222,9 @@ class EnhancedMemoryServer(MemoryServer):
                     logger.info("Stopping auto-sync manager...")
                     await self.auto_sync_manager.stop()
             
+            # Remove the streamed batch analysis results
+            self.remove_batch_result_files()
+            
             # Clean up any other resources
             logger.info("Enhanced memory server cleanup completed")
             
@@ -2080,7 +2256,10 @@ async def main():
         enable_code_intelligence=True,
         mcp_context=mcp_context
     )
-    await server.run()
+    try:
+        await server.run()
+    finally:
+        await server.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -277,6 +277,17 @@ class RepositoryMetadata:
             "branch": self.branch
         }
 
+@dataclass
+class IngestStats:
+    """Outcome of ingesting a single code file."""
+    chunks_ok: int = 0
+    chunks_total: int = 0
+    errors: List[str] = None
+    
+    def __post_init__(self):
+        if self.errors is None:
+            self.errors = []
+
 def detect_language_from_extension(file_path: str) -> str:
     """Detect programming language from file extension."""
     extension_map = {
@@ -1,10 +1,13 @@
 # src/mcp_memory_service/performance/cache.py
 """
 Performance caching layer for code intelligence system.
-Implements in-memory LRU cache with TTL for search results.
+Implements in-memory caches with TTL, TinyLFU admission and value-scored eviction.
 """
 import time
+import math
+import heapq
 import hashlib
+import itertools
 import logging
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
@@ -88,20 +91,26 @@ class LRUCache:
             ttl = ttl or self.default_ttl
             now = time.time()
             
-            entry = CacheEntry(
+            entry = self.cache.get(key)
+            if entry is not None:
+                # Refresh the existing entry rather than allocating a new one
+                entry.data = value
+                entry.created_at = now
+                entry.last_accessed = now
+                entry.ttl = ttl
+                self.cache.move_to_end(key)
+                return
+            
+            self.cache[key] = CacheEntry(
                 data=value,
                 created_at=now,
                 last_accessed=now,
                 ttl=ttl
             )
             
-            self.cache[key] = entry
-            self.cache.move_to_end(key)
-            
             # Evict oldest if over max size
             while len(self.cache) > self.max_size:
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
+                self.cache.popitem(last=False)
                 self.stats['evictions'] += 1
     
     def invalidate(self, pattern: Optional[str] = None) -> int:
@@ -150,11 +159,355 @@ class LRUCache:
                 'total_requests': total_requests
             }
 
+class FrequencySketch:
+    """Count-Min Sketch of access frequencies, halved periodically so stale popularity fades."""
+    
+    MAX_COUNT = 15  # 4-bit counters, as in TinyLFU
+    
+    def __init__(self, width: int = 1024, depth: int = 4, sample_size: Optional[int] = None):
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or 10 * width
+        self.table: List[List[int]] = [[0] * width for _ in range(depth)]
+        self.additions = 0
+    
+    def _indexes(self, key: str) -> List[int]:
+        """Derive one independent counter index per row from a single digest."""
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [
+            int.from_bytes(digest[row * 4:(row + 1) * 4], 'little') % self.width
+            for row in range(self.depth)
+        ]
+    
+    def estimate(self, key: str) -> int:
+        """Estimated access count for key."""
+        return min(self.table[row][index] for row, index in enumerate(self._indexes(key)))
+    
+    def increment(self, key: str) -> None:
+        """Record one access, only raising the counters that hold the current minimum."""
+        indexes = self._indexes(key)
+        current = min(self.table[row][index] for row, index in enumerate(indexes))
+        if current >= self.MAX_COUNT:
+            return
+        for row, index in enumerate(indexes):
+            if self.table[row][index] == current:
+                self.table[row][index] = current + 1
+        
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._reset()
+    
+    def _reset(self) -> None:
+        """Age every counter by halving it."""
+        for row in self.table:
+            for index, count in enumerate(row):
+                row[index] = count >> 1
+        self.additions //= 2
+
+@dataclass
+class SearchCacheEntry(CacheEntry):
+    """Cache entry that also records what it cost to produce and how big it is."""
+    cost_ms: float = 0.0
+    size_bytes: int = 1
+
+class TinyLFUCache(LRUCache):
+    """Thread-safe cache with TinyLFU admission over a segmented LRU.
+    
+    New entries land in a probation segment and move to a protected segment on
+    their second hit. When the cache is full, a newcomer only displaces the
+    probation victim if the frequency sketch says it is requested more often.
+    """
+    
+    def __init__(self, max_size: int = 1000, default_ttl: float = 300.0,
+                 protected_ratio: float = 0.8, sketch_width: int = 1024, sketch_depth: int = 4):
+        super().__init__(max_size, default_ttl)
+        # self.cache (from LRUCache) is the probation segment
+        self.protected: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.max_protected = int(max_size * protected_ratio)
+        self.sketch = FrequencySketch(
+            width=sketch_width,
+            depth=sketch_depth,
+            sample_size=10 * max(sketch_width, max_size)
+        )
+        self.stats['admissions'] = 0
+        self.stats['rejections'] = 0
+    
+    def _segment_for(self, key: str) -> Optional[OrderedDict]:
+        """Return the segment currently holding key, if any."""
+        if key in self.protected:
+            return self.protected
+        if key in self.cache:
+            return self.cache
+        return None
+    
+    def _demote_overflow(self) -> None:
+        """Move least recently used protected entries back to probation."""
+        while len(self.protected) > self.max_protected:
+            key, entry = self.protected.popitem(last=False)
+            self.cache[key] = entry
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get item from cache."""
+        with self.lock:
+            self.sketch.increment(key)
+            segment = self._segment_for(key)
+            if segment is None:
+                self.stats['misses'] += 1
+                return None
+            
+            entry = segment[key]
+            
+            # Check if expired
+            if entry.is_expired():
+                del segment[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            if segment is self.cache:
+                # Second hit promotes the entry out of probation
+                del self.cache[key]
+                self.protected[key] = entry
+                self._demote_overflow()
+            else:
+                self.protected.move_to_end(key)
+            
+            entry.touch()
+            self.stats['hits'] += 1
+            
+            return entry.data
+    
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Put item in cache if the admission policy accepts it."""
+        with self.lock:
+            ttl = ttl or self.default_ttl
+            now = time.time()
+            
+            segment = self._segment_for(key)
+            if segment is not None:
+                # Refresh the existing entry rather than allocating a new one
+                entry = segment[key]
+                entry.data = value
+                entry.created_at = now
+                entry.last_accessed = now
+                entry.ttl = ttl
+                segment.move_to_end(key)
+                return
+            
+            entry = CacheEntry(
+                data=value,
+                created_at=now,
+                last_accessed=now,
+                ttl=ttl
+            )
+            
+            if len(self.cache) + len(self.protected) >= self.max_size:
+                victim_segment = self.cache if self.cache else self.protected
+                if not victim_segment:
+                    self.stats['rejections'] += 1
+                    return
+                victim_key = next(iter(victim_segment))
+                victim = victim_segment[victim_key]
+                if not victim.is_expired() and \
+                        self.sketch.estimate(key) <= self.sketch.estimate(victim_key):
+                    self.stats['rejections'] += 1
+                    return
+                del victim_segment[victim_key]
+                self.stats['evictions'] += 1
+            
+            self.cache[key] = entry
+            self.stats['admissions'] += 1
+    
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        """Invalidate cache entries. If pattern provided, only matching keys."""
+        with self.lock:
+            count = 0
+            for segment in (self.cache, self.protected):
+                if pattern is None:
+                    count += len(segment)
+                    segment.clear()
+                    continue
+                keys_to_remove = [k for k in segment.keys() if pattern in k]
+                for key in keys_to_remove:
+                    del segment[key]
+                count += len(keys_to_remove)
+            return count
+    
+    def cleanup_expired(self) -> int:
+        """Remove expired entries from cache."""
+        with self.lock:
+            removed = 0
+            for segment in (self.cache, self.protected):
+                expired_keys = [key for key, entry in segment.items() if entry.is_expired()]
+                for key in expired_keys:
+                    del segment[key]
+                removed += len(expired_keys)
+            
+            self.stats['expired'] += removed
+            return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self.lock:
+            stats = super().get_stats()
+            stats['size'] = len(self.cache) + len(self.protected)
+            stats['admissions'] = self.stats['admissions']
+            stats['rejections'] = self.stats['rejections']
+            return stats
+
+class ValueScoredCache(LRUCache):
+    """Thread-safe cache that evicts the entry with the lowest retention value.
+    
+    An entry's value is log1p(frequency) * cost_ms / size_bytes, so cheap, large
+    or rarely requested results go first. Frequencies come from a sketch, which
+    also counts requests for keys that are not cached yet. A newcomer is only
+    admitted to a full cache if it is worth more than the current minimum.
+    """
+    
+    def __init__(self, max_size: int = 1000, default_ttl: float = 300.0,
+                 sketch_width: int = 1024, sketch_depth: int = 4):
+        super().__init__(max_size, default_ttl)
+        self.sketch = FrequencySketch(
+            width=sketch_width,
+            depth=sketch_depth,
+            sample_size=10 * max(sketch_width, max_size)
+        )
+        # Min-heap of (score, seq, key, entry); stale rows are skipped lazily
+        self._heap: List[Tuple[float, int, str, SearchCacheEntry]] = []
+        self._seq = itertools.count()
+        self.stats['admissions'] = 0
+        self.stats['rejections'] = 0
+    
+    def _score(self, key: str, entry: SearchCacheEntry) -> float:
+        """Retention value of an entry."""
+        frequency = self.sketch.estimate(key)
+        return math.log1p(frequency) * max(entry.cost_ms, 0.001) / max(entry.size_bytes, 1)
+    
+    def _push(self, key: str, entry: SearchCacheEntry) -> None:
+        """Record the current score of an entry, compacting the heap if it grew stale."""
+        heapq.heappush(self._heap, (self._score(key, entry), next(self._seq), key, entry))
+        if len(self._heap) > 2 * len(self.cache) + 32:
+            # Rebuild from the live entries, dropping the stale rows
+            self._heap = [
+                (self._score(k, e), next(self._seq), k, e) for k, e in self.cache.items()
+            ]
+            heapq.heapify(self._heap)
+    
+    def _peek_victim(self) -> Optional[Tuple[float, str, SearchCacheEntry]]:
+        """Return (score, key, entry) of the lowest-valued live entry."""
+        while self._heap:
+            score, _, key, entry = self._heap[0]
+            if self.cache.get(key) is not entry:
+                heapq.heappop(self._heap)
+                continue
+            current = self._score(key, entry)
+            if current != score:
+                # Frequency moved since this row was pushed
+                heapq.heapreplace(self._heap, (current, next(self._seq), key, entry))
+                continue
+            return score, key, entry
+        return None
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get item from cache."""
+        with self.lock:
+            self.sketch.increment(key)
+            entry = self.cache.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            
+            # Check if expired
+            if entry.is_expired():
+                del self.cache[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            entry.touch()
+            self._push(key, entry)
+            self.stats['hits'] += 1
+            
+            return entry.data
+    
+    def put(self, key: str, value: Any, ttl: Optional[float] = None,
+            cost_ms: float = 0.0, size_bytes: int = 1) -> None:
+        """Put item in cache if it is worth more than the entry it would displace."""
+        with self.lock:
+            ttl = ttl or self.default_ttl
+            now = time.time()
+            
+            entry = self.cache.get(key)
+            if entry is not None:
+                # Refresh the existing entry rather than allocating a new one;
+                # its older heap rows are rescored when they reach the top
+                entry.data = value
+                entry.created_at = now
+                entry.last_accessed = now
+                entry.ttl = ttl
+                entry.cost_ms = cost_ms
+                entry.size_bytes = size_bytes
+                self._push(key, entry)
+                return
+            
+            entry = SearchCacheEntry(
+                data=value,
+                created_at=now,
+                last_accessed=now,
+                ttl=ttl,
+                cost_ms=cost_ms,
+                size_bytes=size_bytes
+            )
+            
+            if len(self.cache) >= self.max_size:
+                victim = self._peek_victim()
+                if victim is None:
+                    self.stats['rejections'] += 1
+                    return
+                victim_score, victim_key, victim_entry = victim
+                if not victim_entry.is_expired() and self._score(key, entry) <= victim_score:
+                    self.stats['rejections'] += 1
+                    return
+                heapq.heappop(self._heap)
+                del self.cache[victim_key]
+                self.stats['evictions'] += 1
+            
+            self.cache[key] = entry
+            self._push(key, entry)
+            self.stats['admissions'] += 1
+    
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        """Invalidate cache entries. If pattern provided, only matching keys."""
+        with self.lock:
+            count = super().invalidate(pattern)
+            if not self.cache:
+                self._heap.clear()
+            return count
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self.lock:
+            stats = super().get_stats()
+            scores = [self._score(key, entry) for key, entry in self.cache.items()]
+            stats['admissions'] = self.stats['admissions']
+            stats['rejections'] = self.stats['rejections']
+            stats['avg_value_score'] = sum(scores) / len(scores) if scores else 0.0
+            return stats
+
+def _estimate_results_size(results: List[MemoryQueryResult]) -> int:
+    """Rough in-memory footprint of a search result list, in bytes."""
+    size = 64
+    for result in results:
+        memory = getattr(result, 'memory', None)
+        content = getattr(memory, 'content', '') or ''
+        size += 256 + len(content)
+    return size
+
 class SearchCache:
     """Specialized cache for search results."""
     
     def __init__(self, max_size: int = 500, default_ttl: float = 600.0):
-        self.cache = LRUCache(max_size, default_ttl)
+        self.cache = ValueScoredCache(max_size, default_ttl)
         logger.info(f"SearchCache initialized: max_size={max_size}, ttl={default_ttl}s")
     
     def get_search_results(self, query: str, repository: str = None, 
@@ -175,14 +528,16 @@ class SearchCache:
     
     def cache_search_results(self, query: str, results: List[MemoryQueryResult],
                            repository: str = None, language: str = None, 
-                           n_results: int = 10, ttl: float = None) -> None:
-        """Cache search results."""
+                           n_results: int = 10, ttl: float = None,
+                           cost_ms: float = 0.0) -> None:
+        """Cache search results along with how long they took to compute."""
         cache_key = self.cache._generate_key(
             'search', query=query, repository=repository,
             language=language, n_results=n_results
         )
         
-        self.cache.put(cache_key, results, ttl)
+        self.cache.put(cache_key, results, ttl, cost_ms=cost_ms,
+                       size_bytes=_estimate_results_size(results))
         logger.debug(f"Cached search results: '{query}' -> {len(results)} results (key: {cache_key[:8]})")
     
     def invalidate_search_cache(self, repository: str = None) -> int:
@@ -201,7 +556,7 @@ class StatsCache:
     """Specialized cache for repository statistics."""
     
     def __init__(self, max_size: int = 100, default_ttl: float = 1800.0):  # 30 minutes
-        self.cache = LRUCache(max_size, default_ttl)
+        self.cache = TinyLFUCache(max_size, default_ttl)
         logger.info(f"StatsCache initialized: max_size={max_size}, ttl={default_ttl}s")
     
     def get_stats(self, repository: str = None) -> Optional[Dict[str, Any]]:
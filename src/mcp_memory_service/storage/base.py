@@ -3,6 +3,7 @@ MCP Memory Service
 Copyright (c) 2024 Heinrich Krupp
 Licensed under the MIT License. See LICENSE file in the project root for full license text.
 """
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any, Tuple
 from ..models.memory import Memory, MemoryQueryResult
@@ -38,4 +39,29 @@ class MemoryStorage(ABC):
     @abstractmethod
     async def cleanup_duplicates(self) -> Tuple[int, str]:
         """Remove duplicate memories. Returns (count_removed, message)."""
-        pass
\ No newline at end of file
+        pass
+    
+    async def store_many(self, memories: List[Memory]) -> List[Tuple[bool, str]]:
+        """Store several memories. Returns one (success, message) per memory.
+        
+        This fallback issues the store calls concurrently; backends that can
+        embed and write a batch in one round trip should override it.
+        """
+        outcomes = await asyncio.gather(
+            *(self.store(memory) for memory in memories), return_exceptions=True
+        )
+        return [
+            (False, f"Error storing memory: {outcome}") if isinstance(outcome, Exception) else outcome
+            for outcome in outcomes
+        ]
+    
+    async def register_repository(self, name: str, last_sync: Optional[float] = None) -> None:
+        """Record a repository name so list_repositories can return it.
+        
+        Backends without a repository index ignore this.
+        """
+        pass
+    
+    async def list_repositories(self) -> List[str]:
+        """Return the sorted names of all repositories with ingested code."""
+        return []
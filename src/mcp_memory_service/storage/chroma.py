@@ -13,6 +13,7 @@ import os
 import time
 import traceback
 import asyncio
+import functools
 from concurrent.futures import ThreadPoolExecutor
 from chromadb.utils import embedding_functions
 from sentence_transformers import SentenceTransformer
@@ -21,6 +22,7 @@ from typing import List, Dict, Any, Tuple, Set, Optional
 from datetime import datetime, date
 
 from .base import MemoryStorage
+from .repository_index import RepositoryIndex
 from ..models.memory import Memory, MemoryQueryResult
 from ..utils.hashing import generate_content_hash
 from ..utils.system_detection import (
@@ -45,6 +47,11 @@ MODEL_FALLBACKS = [
     'paraphrase-albert-small-v2' # Smallest model, last resort
 ]
 
+@functools.lru_cache(maxsize=4)
+def _load_sentence_transformer(model_name: str, device: str) -> SentenceTransformer:
+    """Load a SentenceTransformer once per (model, device) for the life of the process."""
+    return SentenceTransformer(model_name, device=device)
+
 class ChromaMemoryStorage(MemoryStorage):
     def __init__(self, path: str):
         """Initialize ChromaDB storage with hardware-aware embedding function."""
@@ -53,6 +60,9 @@ class ChromaMemoryStorage(MemoryStorage):
         self.embedding_function = None
         self.client = None
         self.collection = None
+        self._repository_index = None
+        # Repository names already in the index, so storing chunks rarely writes to it
+        self._known_repositories = set()
         self.system_info = get_system_info()
         self.embedding_settings = get_optimal_embedding_settings()
         self._chroma_lock = ChromaDBLock(path)
@@ -94,6 +104,11 @@ class ChromaMemoryStorage(MemoryStorage):
                 embedding_function=self.embedding_function
             )
             logger.info("Collection initialized successfully")
+            
+            # Distinct repository names live in a side table so listing them never scans chunks
+            self._repository_index = RepositoryIndex(os.path.join(path, "repositories.db"))
+            if self._repository_index.is_empty():
+                self._backfill_repository_index()
         except Exception as e:
             logger.error(f"Error initializing ChromaDB: {str(e)}")
             logger.error(traceback.format_exc())
@@ -101,6 +116,60 @@ class ChromaMemoryStorage(MemoryStorage):
             print(f"ChromaDB initialization error: {str(e)}", file=sys.stderr)
             # We still need to continue initialization for Smithery to work
     
+    def _backfill_repository_index(self):
+        """Populate the repository index from code chunks stored before it existed."""
+        try:
+            results = self.collection.get(where={"code_chunk": True}, include=["metadatas"])
+            names = {
+                metadata.get("repository")
+                for metadata in results.get("metadatas") or []
+                if metadata and metadata.get("repository")
+            }
+            if names:
+                self._repository_index.register_many(names)
+                logger.info(f"Backfilled repository index with {len(names)} repositories")
+        except Exception as e:
+            logger.warning(f"Could not backfill repository index: {str(e)}")
+    
+    def _register_chunk_repositories(self, memories: List[Memory]) -> None:
+        """Add the repositories of stored code chunks to the index.
+        
+        Every ingest path (batch analysis, auto-sync, the CLI) stores through
+        store() or store_many(), so registering here keeps the index complete.
+        """
+        if self._repository_index is None:
+            return
+        names = {
+            memory.metadata.get("repository")
+            for memory in memories
+            if memory.metadata.get("code_chunk")
+        }
+        names.discard(None)
+        names.discard("")
+        names -= self._known_repositories
+        if not names:
+            return
+        try:
+            self._repository_index.register_many(names)
+        except Exception as e:
+            # The chunks are stored; a later store or the backfill can still register them
+            logger.warning(f"Could not register repositories {sorted(names)}: {str(e)}")
+            return
+        self._known_repositories |= names
+    
+    async def register_repository(self, name: str, last_sync: Optional[float] = None) -> None:
+        """Record a repository name in the repository index."""
+        if self._repository_index is None or not name:
+            return
+        await self._run_async(self._repository_index.register, name, last_sync)
+        self._known_repositories.add(name)
+    
+    async def list_repositories(self) -> List[str]:
+        """Return the names of all repositories with ingested code."""
+        if self._repository_index is None:
+            return []
+        return await self._run_async(self._repository_index.names)
+    
     def _initialize_embedding_model(self):
         """Initialize the embedding model with fallbacks for different hardware."""
         # Start with the optimal model for this system
@@ -117,10 +186,7 @@ class ChromaMemoryStorage(MemoryStorage):
                 start_time = time.time()
                 
                 # Try to initialize the model with the current settings
-                self.model = SentenceTransformer(
-                    model_name,
-                    device=device
-                )
+                self.model = _load_sentence_transformer(model_name, device)
                 
                 # Set batch size based on available resources
                 self.model.max_seq_length = 384  # Default max sequence length
@@ -147,7 +213,7 @@ class ChromaMemoryStorage(MemoryStorage):
                 if device != "cpu":
                     try:
                         logger.info(f"Falling back to CPU for model: {model_name}")
-                        self.model = SentenceTransformer(model_name, device="cpu")
+                        self.model = _load_sentence_transformer(model_name, "cpu")
                         _ = self.model.encode("Test encoding", batch_size=max(1, batch_size // 2))
                         
                         # Update settings to reflect CPU usage
@@ -238,9 +304,11 @@ class ChromaMemoryStorage(MemoryStorage):
             # Check for duplicates
             existing = await self._run_async(
                 self.collection.get,
-                where={"content_hash": memory.content_hash}
+                where={"content_hash": memory.content_hash},
+                include=[]
             )
             if existing["ids"]:
+                await self._run_async(self._register_chunk_repositories, [memory])
                 return False, "Duplicate content detected"
             
             # Format metadata properly
@@ -259,6 +327,7 @@ class ChromaMemoryStorage(MemoryStorage):
                 metadatas=[metadata],
                 ids=[memory_id]
             )
+            await self._run_async(self._register_chunk_repositories, [memory])
             
             return True, f"Successfully stored memory with ID: {memory_id}"
             
@@ -267,6 +336,66 @@ class ChromaMemoryStorage(MemoryStorage):
             logger.error(error_msg)
             return False, error_msg
 
+    @with_chroma_lock(timeout=30.0)
+    @with_retry(max_attempts=3, delay=1.0)
+    async def store_many(self, memories: List[Memory]) -> List[Tuple[bool, str]]:
+        """Store a batch of memories with one duplicate check and one add."""
+        if not memories:
+            return []
+        
+        try:
+            if self.collection is None:
+                error_msg = "Collection not initialized, cannot store memory"
+                logger.error(error_msg)
+                return [(False, error_msg)] * len(memories)
+            
+            # Duplicates are matched on the content_hash metadata, as in store(),
+            # with one lookup for the whole batch
+            existing = await self._run_async(
+                self.collection.get,
+                where={"content_hash": {"$in": list({memory.content_hash for memory in memories})}},
+                include=["metadatas"]
+            )
+            seen = {metadata["content_hash"] for metadata in existing["metadatas"] if metadata}
+            
+            results: List[Tuple[bool, str]] = []
+            new_memories: List[Memory] = []
+            for memory in memories:
+                if memory.content_hash in seen:
+                    results.append((False, "Duplicate content detected"))
+                    continue
+                seen.add(memory.content_hash)
+                new_memories.append(memory)
+                results.append((True, f"Successfully stored memory with ID: {memory.content_hash}"))
+            
+            if not new_memories:
+                await self._run_async(self._register_chunk_repositories, memories)
+                return results
+            
+            documents = [memory.content for memory in new_memories]
+            metadatas = []
+            for memory in new_memories:
+                metadata = self._format_metadata_for_chroma(memory)
+                metadata.update(memory.metadata)
+                metadatas.append(metadata)
+            
+            # Add to collection - the collection's embedding function embeds the
+            # whole batch in one call, exactly as it does for store()
+            await self._run_async(
+                self.collection.add,
+                documents=documents,
+                metadatas=metadatas,
+                ids=[memory.content_hash for memory in new_memories]
+            )
+            await self._run_async(self._register_chunk_repositories, memories)
+            
+            return results
+            
+        except Exception as e:
+            error_msg = f"Error storing memories: {str(e)}"
+            logger.error(error_msg)
+            return [(False, error_msg)] * len(memories)
+
     async def search_by_tag(self, tags: List[str]) -> List[Memory]:
         try:
             results = await self._run_async(
@@ -472,7 +601,8 @@ class ChromaMemoryStorage(MemoryStorage):
             # First check if the memory exists
             existing = await self._run_async(
                 self.collection.get,
-                where={"content_hash": content_hash}
+                where={"content_hash": content_hash},
+                include=[]
             )
             
             if not existing["ids"]:
@@ -495,11 +625,25 @@ class ChromaMemoryStorage(MemoryStorage):
         """Remove duplicate memories based on content hash."""
         try:
             # Get all memories
-            results = await self._run_async(self.collection.get)
+            results = await self._run_async(self.collection.get, include=["metadatas"])
             
             if not results["ids"]:
                 return 0, "No memories found in database"
             
+            # Documents are only needed to hash rows that lack a stored content_hash
+            missing_ids = [
+                results["ids"][i] for i, metadata in enumerate(results["metadatas"])
+                if not metadata.get("content_hash")
+            ]
+            documents_by_id: Dict[str, str] = {}
+            if missing_ids:
+                fetched = await self._run_async(
+                    self.collection.get,
+                    ids=missing_ids,
+                    include=["documents"]
+                )
+                documents_by_id = dict(zip(fetched["ids"], fetched["documents"]))
+            
             # Track seen hashes and duplicates
             seen_hashes: Set[str] = set()
             duplicates = []
@@ -508,7 +652,7 @@ class ChromaMemoryStorage(MemoryStorage):
                 content_hash = metadata.get("content_hash")
                 if not content_hash:
                     # Generate hash if missing
-                    content_hash = generate_content_hash(results["documents"][i], metadata)
+                    content_hash = generate_content_hash(documents_by_id[results["ids"][i]], metadata)
                 
                 if content_hash in seen_hashes:
                     duplicates.append(results["ids"][i])
@@ -0,0 +1,67 @@
+"""
+MCP Memory Service
+Copyright (c) 2024 Heinrich Krupp
+Licensed under the MIT License. See LICENSE file in the project root for full license text.
+"""
+import sqlite3
+import time
+import logging
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class RepositoryIndex:
+    """Small SQLite table of known repository names, kept next to the vector store."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_database()
+
+    @contextmanager
+    def _get_db_connection(self):
+        """Get database connection with proper cleanup."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_database(self):
+        """Create the repositories table if it does not exist."""
+        with self._get_db_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS repositories (
+                    name TEXT PRIMARY KEY,
+                    last_sync REAL
+                )
+            """)
+            conn.commit()
+
+    def register(self, name: str, last_sync: Optional[float] = None) -> None:
+        """Record a repository; idempotent, refreshing last_sync when given."""
+        self.register_many([name], last_sync)
+
+    def register_many(self, names: Iterable[str], last_sync: Optional[float] = None) -> None:
+        """Record several repositories in one transaction."""
+        timestamp = last_sync if last_sync is not None else time.time()
+        with self._get_db_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO repositories (name, last_sync) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET last_sync = excluded.last_sync
+                """,
+                [(name, timestamp) for name in names if name]
+            )
+            conn.commit()
+
+    def names(self) -> List[str]:
+        """Return all known repository names in sorted order."""
+        with self._get_db_connection() as conn:
+            rows = conn.execute("SELECT name FROM repositories ORDER BY name").fetchall()
+        return [row[0] for row in rows]
+
+    def is_empty(self) -> bool:
+        """Return True if no repository has been recorded yet."""
+        with self._get_db_connection() as conn:
+            return conn.execute("SELECT 1 FROM repositories LIMIT 1").fetchone() is None
@@ -246,8 +246,59 @@ class RequestQueue:
                 logger.error(f"Error in request queue worker: {e}")
 
 
+_instance_locks_guard = threading.Lock()
+
+
+def _instance_thread_lock(instance) -> threading.Lock:
+    """Return the lock that serializes one instance's locked operations across threads."""
+    with _instance_locks_guard:
+        lock = instance.__dict__.get('_chroma_thread_lock')
+        if lock is None:
+            lock = instance._chroma_thread_lock = threading.Lock()
+        return lock
+
+
+def _instance_async_lock(instance) -> asyncio.Lock:
+    """Return the lock that serializes one instance's locked coroutines on the running loop."""
+    loop = asyncio.get_running_loop()
+    locks = instance.__dict__.get('_chroma_async_locks')
+    if locks is None:
+        locks = instance._chroma_async_locks = {}
+    lock = locks.get(loop)
+    if lock is None:
+        # An asyncio.Lock is bound to one loop; drop locks of loops that have closed
+        for stale in [other for other in locks if other.is_closed()]:
+            del locks[stale]
+        lock = locks[loop] = asyncio.Lock()
+    return lock
+
+
+async def _acquire_in_thread(acquire: Callable[[], bool], release: Callable[[], None]) -> bool:
+    """Run a blocking acquire in a worker thread without blocking the event loop.
+    
+    If the caller is cancelled while waiting, the lock is released as soon as
+    the worker thread gets it, so a cancelled wait never leaks the lock.
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, acquire)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        def _release_if_acquired(done: asyncio.Future) -> None:
+            if not done.cancelled() and done.exception() is None and done.result():
+                release()
+        future.add_done_callback(_release_if_acquired)
+        raise
+
+
 def with_chroma_lock(timeout: float = 30.0):
-    """Decorator for ChromaDB operations that require exclusive access."""
+    """Decorator for ChromaDB operations that require exclusive access.
+    
+    The instance's ChromaDBLock holds a single file descriptor, so callers in
+    this process are serialized first - coroutines by an asyncio.Lock, threads
+    by a threading.Lock - and the file lock only excludes other processes.
+    The file lock is acquired in a worker thread so the event loop keeps running
+    while another process holds it.
+    """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         async def async_wrapper(self, *args, **kwargs) -> T:
@@ -255,8 +306,19 @@ def with_chroma_lock(timeout: float = 30.0):
             if not hasattr(self, '_chroma_lock'):
                 self._chroma_lock = ChromaDBLock(self.path, timeout)
             
-            with self._chroma_lock:
-                return await func(self, *args, **kwargs)
+            file_lock = self._chroma_lock
+            async with _instance_async_lock(self):
+                thread_lock = _instance_thread_lock(self)
+                await _acquire_in_thread(thread_lock.acquire, thread_lock.release)
+                try:
+                    if not await _acquire_in_thread(file_lock.acquire, file_lock.release):
+                        raise TimeoutError(f"Could not acquire ChromaDB lock within {file_lock.timeout}s")
+                    try:
+                        return await func(self, *args, **kwargs)
+                    finally:
+                        file_lock.release()
+                finally:
+                    thread_lock.release()
         
         @wraps(func)
         def sync_wrapper(self, *args, **kwargs) -> T:
@@ -264,7 +326,7 @@ def with_chroma_lock(timeout: float = 30.0):
             if not hasattr(self, '_chroma_lock'):
                 self._chroma_lock = ChromaDBLock(self.path, timeout)
             
-            with self._chroma_lock:
+            with _instance_thread_lock(self), self._chroma_lock:
                 return func(self, *args, **kwargs)
         
         if asyncio.iscoroutinefunction(func):
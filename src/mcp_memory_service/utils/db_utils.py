@@ -200,7 +200,7 @@ async def repair_database(storage) -> Tuple[bool, str]:
             all_metadatas = []
             
             # First get all IDs
-            result = storage.collection.get(limit=1)  # Get one to check structure
+            result = storage.collection.get(limit=1, include=[])  # Get one to check structure
             if result and result.get('ids'):
                 # Get total count
                 total_count = storage.collection.count()
@@ -0,0 +1,71 @@
+"""
+Test an end-to-end batch run over a small repository.
+"""
+import json
+import pytest
+from mcp_memory_service.code_intelligence.batch.batch_processor import BatchProcessor
+
+class _RecordingStorage:
+    """Accepts every memory and remembers what was stored."""
+
+    def __init__(self):
+        self.stored = []
+
+    async def store_many(self, memories):
+        self.stored.extend(memories)
+        return [(True, f"Successfully stored memory with ID: {memory.content_hash}") for memory in memories]
+
+@pytest.fixture
+def repository(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    (repo / "node_modules" / "dep").mkdir(parents=True)
+    (repo / "main.py").write_text("def main():\n    return helper()\n\n\ndef helper():\n    return 1\n")
+    (repo / "pkg" / "util.py").write_text("class Util:\n    def run(self):\n        return 'ok'\n")
+    (repo / "node_modules" / "dep" / "index.js").write_text("module.exports = function () {};\n")
+    (repo / "notes.bin").write_bytes(b"\x00\x01")
+    return repo
+
+@pytest.mark.asyncio
+async def test_process_repository_writes_ndjson_results(repository, tmp_path):
+    storage = _RecordingStorage()
+    processor = BatchProcessor(storage, max_workers=1)
+    results_path = tmp_path / "results.ndjson"
+
+    result = await processor.process_repository(
+        str(repository), "repo", results_path=str(results_path)
+    )
+
+    assert result.file_results_path == str(results_path)
+    assert result.file_results == {}
+    lines = results_path.read_text(encoding="utf-8").splitlines()
+    file_results = [json.loads(line) for line in lines]
+    assert sorted(file_result["file_path"] for file_result in file_results) == sorted([
+        str(repository / "main.py"), str(repository / "pkg" / "util.py")
+    ])
+    assert all(not file_result.get("error") for file_result in file_results)
+    assert all("_chunk_objects" not in file_result for file_result in file_results)
+    assert dict(result.iter_file_results()).keys() == {
+        file_result["file_path"] for file_result in file_results
+    }
+
+    assert result.progress.total_files == 2
+    assert result.progress.processed_files == 2
+    assert result.progress.failed_files == 0
+    assert result.language_summary["python"] == 2
+    assert result.progress.total_chunks == sum(fr["chunks_created"] for fr in file_results) > 0
+    assert result.progress.stored_chunks == len(storage.stored) == result.progress.total_chunks
+
+@pytest.mark.asyncio
+async def test_process_repository_with_no_files_leaves_empty_results_file(tmp_path):
+    empty_repo = tmp_path / "empty"
+    empty_repo.mkdir()
+    results_path = tmp_path / "results.ndjson"
+
+    result = await BatchProcessor(_RecordingStorage(), max_workers=1).process_repository(
+        str(empty_repo), "empty", results_path=str(results_path)
+    )
+
+    assert result.progress.total_files == 0
+    assert results_path.read_text(encoding="utf-8") == ""
+    assert list(result.iter_file_results()) == []
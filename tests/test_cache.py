@@ -0,0 +1,119 @@
+"""
+Test admission, eviction and refresh behaviour of the code intelligence caches.
+"""
+import pytest
+from mcp_memory_service.performance.cache import TinyLFUCache, ValueScoredCache
+
+def _request(cache, key, times):
+    """Record requests for a key; misses still count towards its frequency."""
+    for _ in range(times):
+        cache.get(key)
+
+def test_tinylfu_rejects_newcomer_less_frequent_than_victim():
+    """A full cache keeps its probation victim if the newcomer is requested less often."""
+    cache = TinyLFUCache(max_size=2)
+    _request(cache, "a", 3)
+    _request(cache, "b", 3)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    cache.put("c", 3)
+
+    assert cache.get("c") is None
+    assert cache.get("a") == 1
+    assert cache.get("b") == 2
+    assert cache.stats['rejections'] == 1
+
+def test_tinylfu_admits_newcomer_more_frequent_than_victim():
+    """A frequently requested newcomer evicts the least recently used probation entry."""
+    cache = TinyLFUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    _request(cache, "c", 5)
+
+    cache.put("c", 3)
+
+    assert cache.get("c") == 3
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats['evictions'] == 1
+
+def test_tinylfu_second_hit_promotes_to_protected():
+    """An entry leaves probation on its second hit."""
+    cache = TinyLFUCache(max_size=10)
+    cache.put("a", 1)
+    assert "a" in cache.cache
+
+    assert cache.get("a") == 1
+
+    assert "a" in cache.protected
+    assert "a" not in cache.cache
+
+def test_value_scored_rejects_newcomer_worth_less_than_victim():
+    """A full cache only admits a newcomer that is worth more than its cheapest entry."""
+    cache = ValueScoredCache(max_size=1)
+    _request(cache, "expensive", 2)
+    cache.put("expensive", 1, cost_ms=500.0, size_bytes=10)
+    _request(cache, "cheap", 2)
+
+    cache.put("cheap", 2, cost_ms=1.0, size_bytes=10)
+
+    assert cache.get("cheap") is None
+    assert cache.get("expensive") == 1
+    assert cache.stats['rejections'] == 1
+
+def test_value_scored_evicts_lowest_value_entry():
+    """The entry with the lowest frequency * cost / size goes first."""
+    cache = ValueScoredCache(max_size=2)
+    for key in ("cheap", "expensive", "newcomer"):
+        _request(cache, key, 2)
+    cache.put("cheap", 1, cost_ms=1.0, size_bytes=100)
+    cache.put("expensive", 2, cost_ms=500.0, size_bytes=100)
+
+    cache.put("newcomer", 3, cost_ms=100.0, size_bytes=100)
+
+    assert cache.get("cheap") is None
+    assert cache.get("expensive") == 2
+    assert cache.get("newcomer") == 3
+    assert cache.stats['evictions'] == 1
+
+@pytest.mark.parametrize("promote", [False, True])
+def test_tinylfu_put_refreshes_existing_entry_in_place(promote):
+    """Putting an existing key updates its entry in whichever segment holds it."""
+    cache = TinyLFUCache(max_size=10)
+    cache.put("a", 1, ttl=10)
+    if promote:
+        cache.get("a")
+    segment = cache.protected if promote else cache.cache
+    entry = segment["a"]
+
+    cache.put("a", 2, ttl=20)
+
+    assert segment["a"] is entry
+    assert entry.data == 2
+    assert entry.ttl == 20
+    assert cache.get_stats()['size'] == 1
+    assert cache.get("a") == 2
+
+def test_value_scored_put_refreshes_existing_entry_in_place():
+    """Putting an existing key updates its entry and the cost used to score it."""
+    cache = ValueScoredCache(max_size=2)
+    _request(cache, "a", 1)
+    cache.put("a", 1, cost_ms=1.0, size_bytes=100)
+    entry = cache.cache["a"]
+
+    cache.put("a", 2, cost_ms=500.0, size_bytes=100)
+
+    assert cache.cache["a"] is entry
+    assert entry.data == 2
+    assert entry.cost_ms == 500.0
+    assert cache.get_stats()['size'] == 1
+
+    # The refreshed cost now protects the entry from a mid-value newcomer
+    _request(cache, "b", 1)
+    cache.put("b", 3, cost_ms=1.0, size_bytes=100)
+    _request(cache, "c", 1)
+    cache.put("c", 4, cost_ms=100.0, size_bytes=100)
+    assert cache.get("a") == 2
+    assert cache.get("b") is None
+    assert cache.get("c") == 4
@@ -0,0 +1,55 @@
+"""
+Test that ChromaDB-locked operations of one storage instance can run concurrently.
+"""
+import asyncio
+import pytest
+from mcp_memory_service.utils.chroma_lock import with_chroma_lock, ChromaDBLock
+
+class _LockedStorage:
+    """Minimal storage whose operations take the ChromaDB lock like ChromaMemoryStorage."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._chroma_lock = ChromaDBLock(self.path, timeout=2.0)
+        self.active = 0
+        self.max_active = 0
+
+    @with_chroma_lock(timeout=2.0)
+    async def write(self, value):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return value
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_serialized_not_timed_out(tmp_path):
+    storage = _LockedStorage(tmp_path)
+
+    results = await asyncio.gather(*(storage.write(i) for i in range(4)))
+
+    assert results == [0, 1, 2, 3]
+    assert storage.max_active == 1
+    # The file lock was released, so later calls still get it
+    assert await storage.write("later") == "later"
+    assert storage._chroma_lock.lock_fd is None
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_keep_the_lock(tmp_path):
+    storage = _LockedStorage(tmp_path)
+    holder = asyncio.ensure_future(storage.write("held"))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(storage.write("cancelled"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await holder == "held"
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert await storage.write("after") == "after"
+
+def test_lock_is_usable_from_successive_event_loops(tmp_path):
+    storage = _LockedStorage(tmp_path)
+
+    assert asyncio.run(storage.write(1)) == 1
+    assert asyncio.run(storage.write(2)) == 2
@@ -0,0 +1,88 @@
+"""Test the structure of the code intelligence CLI."""
+import ast
+import asyncio
+from collections import Counter
+from pathlib import Path
+
+from mcp_memory_service.utils.chroma_lock import with_chroma_lock, ChromaDBLock
+
+CLI_PATH = Path(__file__).parent.parent / "cli.py"
+
+def _cli_method_names():
+    """Return every method name defined on CodeIntelligenceCLI, in order."""
+    tree = ast.parse(CLI_PATH.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "CodeIntelligenceCLI":
+            return [
+                item.name for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+    raise AssertionError("CodeIntelligenceCLI not found in cli.py")
+
+def test_cli_methods_defined_once():
+    """A second definition would silently shadow the first."""
+    duplicates = [name for name, count in Counter(_cli_method_names()).items() if count > 1]
+    assert duplicates == []
+
+def test_list_repositories_present():
+    """Both list-repos and list-repositories dispatch to list_repositories."""
+    assert "list_repositories" in _cli_method_names()
+
+def test_every_subcommand_has_a_handler():
+    """Commands dispatch through COMMAND_HANDLERS; a missing entry would just print help."""
+    import argparse
+    import cli
+    
+    parser = cli.create_parser()
+    subparsers = next(a for a in parser._actions if isinstance(a, argparse._SubParsersAction))
+    assert set(subparsers.choices) == set(cli.COMMAND_HANDLERS)
+
+def test_repository_aliases_start_code_intelligence():
+    """list-repos must initialize the same way as list-repositories."""
+    import cli
+    
+    assert {"list-repos", "list-repositories"} <= cli.CMDS_NEEDING_CODE_INTELLIGENCE
+
+class _LockedStorage:
+    """Storage whose writes take the ChromaDB lock, like ChromaMemoryStorage.store_many."""
+    
+    def __init__(self, path):
+        self.path = str(path)
+        self._chroma_lock = ChromaDBLock(self.path, timeout=2.0)
+        self.stored = []
+    
+    @with_chroma_lock(timeout=2.0)
+    async def store_many(self, chunks):
+        await asyncio.sleep(0.01)
+        self.stored.extend(chunks)
+        return [(True, "stored")] * len(chunks)
+
+class _IngestServer:
+    """Just the server surface ingest_directory uses."""
+    
+    def __init__(self, storage):
+        self.storage = storage
+    
+    @staticmethod
+    def _read_and_chunk(file_path, repository=None, contents=None):
+        return [f"{file_path}:{len(contents)}"]
+    
+    async def _store_code_chunk_results(self, chunks, repository=None):
+        return await self.storage.store_many(chunks)
+
+def test_concurrent_ingest_directory_stores_every_file(tmp_path, capsys):
+    """Concurrent ingest workers share one locked storage without timing out."""
+    import cli
+    
+    source = tmp_path / "src"
+    source.mkdir()
+    for i in range(9):
+        (source / f"module_{i}.py").write_text(f"x = {i}\n")
+    storage = _LockedStorage(tmp_path)
+    
+    ingest = cli.CodeIntelligenceCLI()
+    ingest.server = _IngestServer(storage)
+    asyncio.run(ingest.ingest_directory(str(source), "repo", concurrency=4, batch_size=2))
+    
+    assert len(storage.stored) == 9
+    assert "9/9 files processed" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+"""
+Test the SQLite repository index and its backfill from stored code chunks.
+"""
+import pytest
+from mcp_memory_service.storage.repository_index import RepositoryIndex
+from mcp_memory_service.storage.chroma import ChromaMemoryStorage
+
+@pytest.fixture
+def index(tmp_path):
+    return RepositoryIndex(str(tmp_path / "repositories.db"))
+
+def test_new_index_is_empty(index):
+    assert index.is_empty()
+    assert index.names() == []
+
+def test_register_lists_names_sorted_and_distinct(index):
+    index.register("zeta")
+    index.register_many(["alpha", "zeta", "", "mid"])
+
+    assert not index.is_empty()
+    assert index.names() == ["alpha", "mid", "zeta"]
+
+def test_register_refreshes_last_sync(index):
+    index.register("repo", last_sync=1.0)
+    index.register("repo", last_sync=2.0)
+
+    with index._get_db_connection() as conn:
+        rows = conn.execute("SELECT name, last_sync FROM repositories").fetchall()
+    assert rows == [("repo", 2.0)]
+
+def test_index_persists_across_instances(tmp_path):
+    db_path = str(tmp_path / "repositories.db")
+    RepositoryIndex(db_path).register("repo")
+
+    assert RepositoryIndex(db_path).names() == ["repo"]
+
+class _ChunkCollection:
+    """Stands in for a Chroma collection holding previously ingested chunks."""
+
+    def __init__(self, metadatas):
+        self.metadatas = metadatas
+        self.where = None
+
+    def get(self, where=None, include=None):
+        self.where = where
+        return {"ids": [str(i) for i in range(len(self.metadatas))], "metadatas": self.metadatas}
+
+def test_backfill_registers_repositories_of_existing_chunks(index):
+    storage = ChromaMemoryStorage.__new__(ChromaMemoryStorage)
+    storage._repository_index = index
+    storage.collection = _ChunkCollection([
+        {"code_chunk": True, "repository": "beta"},
+        {"code_chunk": True, "repository": "alpha"},
+        {"code_chunk": True, "repository": "beta"},
+        {"code_chunk": True},
+        None,
+    ])
+
+    storage._backfill_repository_index()
+
+    assert storage.collection.where == {"code_chunk": True}
+    assert index.names() == ["alpha", "beta"]
+
+@pytest.mark.asyncio
+async def test_list_repositories_reads_the_index(index):
+    storage = ChromaMemoryStorage.__new__(ChromaMemoryStorage)
+    storage._repository_index = index
+    storage._known_repositories = set()
+    storage._executor = None
+
+    await storage.register_repository("repo")
+    await storage.register_repository("")
+
+    assert await storage.list_repositories() == ["repo"]
@@ -0,0 +1,127 @@
+"""
+Test batched storage of memories in ChromaMemoryStorage.store_many.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import chromadb
+import pytest
+from chromadb.api.types import EmbeddingFunction
+
+from mcp_memory_service.storage.chroma import ChromaMemoryStorage
+from mcp_memory_service.storage.repository_index import RepositoryIndex
+from mcp_memory_service.models.memory import Memory
+from mcp_memory_service.utils.hashing import generate_content_hash
+from mcp_memory_service.utils.chroma_lock import ChromaDBLock
+
+class _CountingEmbeddingFunction(EmbeddingFunction):
+    """Cheap deterministic embedder that records how it was called."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in input]
+
+@pytest.fixture
+def storage(tmp_path):
+    """Storage wired to a real on-disk collection, without loading an embedding model."""
+    storage = ChromaMemoryStorage.__new__(ChromaMemoryStorage)
+    storage.path = str(tmp_path)
+    storage.model = None
+    storage.embedding_function = _CountingEmbeddingFunction()
+    storage._repository_index = None
+    storage._known_repositories = set()
+    storage._chroma_lock = ChromaDBLock(str(tmp_path))
+    storage._executor = ThreadPoolExecutor(max_workers=1)
+    storage.client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    storage.collection = storage.client.get_or_create_collection(
+        name="memory_collection",
+        metadata={"hnsw:space": "cosine"},
+        embedding_function=storage.embedding_function
+    )
+    yield storage
+    storage._executor.shutdown()
+
+def _memory(content, **metadata):
+    return Memory(content=content, content_hash=generate_content_hash(content), metadata=metadata)
+
+@pytest.mark.asyncio
+async def test_store_many_stores_batch_with_one_embedding_call(storage):
+    memories = [_memory(f"chunk {i}", repository="repo") for i in range(3)]
+
+    results = await storage.store_many(memories)
+
+    assert [success for success, _ in results] == [True, True, True]
+    assert storage.collection.count() == 3
+    assert storage.embedding_function.calls == [[memory.content for memory in memories]]
+    stored = storage.collection.get(ids=[memories[0].content_hash], include=["metadatas"])
+    assert stored["metadatas"][0]["repository"] == "repo"
+    assert stored["metadatas"][0]["content_hash"] == memories[0].content_hash
+
+@pytest.mark.asyncio
+async def test_store_many_reports_duplicates_within_batch(storage):
+    memories = [_memory("same"), _memory("same"), _memory("other")]
+
+    results = await storage.store_many(memories)
+
+    assert [success for success, _ in results] == [True, False, True]
+    assert results[1][1] == "Duplicate content detected"
+    assert storage.collection.count() == 2
+
+@pytest.mark.asyncio
+async def test_store_many_detects_duplicates_by_content_hash_like_store(storage):
+    # A memory stored under a different id is still found through its content_hash metadata
+    existing = _memory("already here")
+    storage.collection.add(
+        documents=[existing.content],
+        metadatas=[{"content_hash": existing.content_hash}],
+        ids=["legacy-id"]
+    )
+
+    results = await storage.store_many([_memory("already here"), _memory("new")])
+
+    assert results[0] == (False, "Duplicate content detected")
+    assert results[1][0] is True
+    assert storage.collection.count() == 2
+
+@pytest.mark.asyncio
+async def test_store_many_then_store_sees_batch_as_duplicate(storage):
+    await storage.store_many([_memory("batched")])
+
+    success, message = await storage.store(_memory("batched"))
+
+    assert not success
+    assert message == "Duplicate content detected"
+
+@pytest.mark.asyncio
+async def test_store_many_empty_batch(storage):
+    assert await storage.store_many([]) == []
+    assert storage.embedding_function.calls == []
+
+@pytest.mark.asyncio
+async def test_concurrent_store_many_calls_are_serialized(storage):
+    # Concurrent ingest workers share one storage; neither call may time out on the lock
+    first = [_memory(f"first {i}") for i in range(3)]
+    second = [_memory(f"second {i}") for i in range(3)]
+
+    results = await asyncio.gather(storage.store_many(first), storage.store_many(second))
+
+    assert all(success for batch in results for success, _ in batch)
+    assert storage.collection.count() == 6
+    assert (await storage.store_many([_memory("later")]))[0][0] is True
+
+@pytest.mark.asyncio
+async def test_stored_code_chunks_register_their_repository(storage, tmp_path):
+    # Batch analysis and auto-sync store chunks without calling register_repository
+    storage._repository_index = RepositoryIndex(str(tmp_path / "repositories.db"))
+
+    await storage.store_many([
+        _memory("def a(): pass", code_chunk=True, repository="beta"),
+        _memory("plain note"),
+    ])
+    await storage.store(_memory("def b(): pass", code_chunk=True, repository="alpha"))
+    await storage.store_many([_memory("def a(): pass", code_chunk=True, repository="beta")])
+
+    assert await storage.list_repositories() == ["alpha", "beta"]